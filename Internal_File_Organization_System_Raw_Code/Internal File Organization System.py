@@ -8,8 +8,21 @@ import threading
 import time
 import re
 import sys
+import random
+import queue
+import itertools
+import multiprocessing
+import sqlite3
+import bisect
+import fnmatch
+import hmac
+import secrets
+import base64
+from collections import OrderedDict
+from array import array
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+from concurrent.futures.process import BrokenProcessPool
 from PIL import Image, ImageTk
-import wave  # This is from Python's standard library
 from vosk import Model, KaldiRecognizer
 import json
 import vlc  # Now it will use the correct path
@@ -73,6 +86,1756 @@ except ImportError:
     PDF_SUPPORT = False
     print("PyMuPDF not found. PDF display will be limited. Install with: pip install PyMuPDF")
 
+try:
+    import numpy as np  # Waveform peaks for audio files
+    NUMPY_SUPPORT = True
+except ImportError:
+    NUMPY_SUPPORT = False
+    print("NumPy not found. Audio waveforms will not be shown. Install with: pip install numpy")
+
+
+VIDEO_EXTENSIONS = ['.mp4', '.avi', '.mkv', '.mov']
+AUDIO_EXTENSIONS = ['.mp3', '.wav', '.flac', '.m4a']
+MEDIA_PRELOAD_LIMIT = 2  # Parsed media kept ready for the next files in the tree
+MEDIA_PARSE_TIMEOUT = 5000  # Milliseconds
+PLAYBACK_POSITIONS_FILE = os.path.join(os.path.dirname(__file__), "playback_positions.json")
+PLAYBACK_RESUME_MARGIN = 10000  # Milliseconds - positions this close to either end are not remembered
+MEDIA_PROBE_CACHE = os.path.join(os.path.dirname(__file__), "media_probe_cache.json")
+MEDIA_PROBE_COLUMNS = ('duration', 'codec', 'resolution', 'bitrate')
+TREE_DETAIL_COLUMNS = ('size', 'modified', 'type')
+
+# Background task settings
+TASK_IO_WORKERS = 4  # Threads for disk reads, database queries and waiting on ffmpeg
+TASK_CPU_WORKERS = os.cpu_count() or 1  # Threads for decoding (NumPy, PIL and PyMuPDF release the GIL)
+TASK_PRIORITY_VISIBLE = 0  # What the user is looking at right now
+TASK_PRIORITY_NORMAL = 1
+TASK_PRIORITY_PREFETCH = 2  # Guesses about what the user will look at next
+TASK_PRIORITY_BACKGROUND = 3  # Scans and indexing
+TEXT_READ_CHUNK = 1024 * 1024  # Characters read between cancellation checks
+TEXT_HEAD_BLOCK = 64 * 1024  # Characters of a text preview read between cancellation checks
+
+# Folders with more entries than this are shown a page at a time
+VIRTUAL_DIR_THRESHOLD = 2000
+VIRTUAL_PAGE_SIZE = 500
+FOLDER_SIZE_TTL = 300  # Seconds a measured folder size is trusted - changes deep inside don't touch its mtime
+
+# Memory settings
+MEMORY_BUDGET_MB = 512  # Default for decoded content and Tk images together - changeable from the Tools menu
+MEMORY_BUDGET_MIN_MB = 64
+
+# Prefetch settings
+PREFETCH_PDF_PAGES = 3  # Leading pages of a PDF rendered ahead of time
+PREFETCH_CSV_BYTES = 8 * 1024 * 1024  # Larger CSV files are only parsed once opened
+
+# Waveform overview settings
+WAVEFORM_SAMPLE_RATE = 8000  # Plenty for peaks, and far less audio to decode
+WAVEFORM_PEAKS_PER_SECOND = 50  # Finest min/max resolution computed from the audio
+WAVEFORM_RESOLUTIONS = (500, 2000, 8000)  # Peak pairs in each cached overview
+WAVEFORM_CACHE_DIR = os.path.join(os.path.dirname(__file__), "waveform_cache")
+WAVEFORM_HEIGHT = 60
+
+# Video filmstrip settings
+THUMBNAIL_WIDTH = 128
+THUMBNAIL_HEIGHT = 72
+THUMBNAIL_COUNT = 120  # At most this many keyframes per video
+THUMBNAIL_MIN_INTERVAL = 2  # Seconds between thumbnails of short videos
+THUMBNAIL_CACHE_DIR = os.path.join(os.path.dirname(__file__), "thumbnail_cache")
+
+# Caption generation settings
+CAPTION_SAMPLE_RATE = 16000
+CAPTION_CHUNK_SECONDS = 120  # Target length of each chunk sent to a worker
+CAPTION_CUT_WINDOW = 30  # How far from the target (in seconds) to look for a silence to cut at
+CAPTION_SILENCE_FILTER = "silencedetect=noise=-35dB:d=0.4"
+CAPTION_WORKERS = os.cpu_count() or 1
+CAPTION_UPDATE_SECONDS = 0.5  # Audio between partial result / progress messages from a worker
+CAPTION_WORKER_MEMORY_FACTOR = 2  # RAM each caption worker needs, as a multiple of the model's size on disk
+TRANSCRIPT_INDEX_DELAY = 3000  # Milliseconds after startup before cached transcripts are indexed
+CAPTION_CACHE_DIR = os.path.join(os.path.dirname(__file__), "caption_cache")
+HASH_SAMPLE_SIZE = 64 * 1024  # Bytes read from each sampled block when fingerprinting a file
+HASH_SAMPLE_COUNT = 8
+CAPTION_BATCH_FILES = 2  # Media files transcribed at the same time when captioning a folder
+CAPTION_BATCH_MANIFEST = os.path.join(CAPTION_CACHE_DIR, "batch.json")
+TRANSCRIPT_INDEX_PATH = os.path.join(CAPTION_CACHE_DIR, "transcripts.db")
+STATE_DB_PATH = os.path.join(os.path.dirname(__file__), "state.db")
+# JSON files the state store replaced - read once into it, then renamed to *.migrated
+STATE_LEGACY_FILES = {'passwords': "passwords.json", 'temp_passwords': "temp_passwords.json",
+                      'settings': "settings.json"}
+# Password hashing - scrypt with a random salt per password. Raising the cost makes
+# existing hashes get rehashed at their next successful unlock.
+PASSWORD_SCRYPT_N = 2 ** 15  # Memory and time cost (128 * N * r bytes - 32 MB)
+PASSWORD_SCRYPT_R = 8
+PASSWORD_SCRYPT_P = 1
+PASSWORD_SALT_BYTES = 16
+PASSWORD_VERIFY_CACHE_SECONDS = 300  # How long a correct password is remembered this session
+TRANSCRIPT_SEARCH_LIMIT = 500
+TRANSCRIPT_CONTEXT_WORDS = 6  # Words shown on each side of a search hit
+
+# Disk usage treemap settings
+TREEMAP_DEPTH = 3  # Folder levels drawn inside each other
+TREEMAP_MIN_PIXELS = 4  # Smaller regions are left out, so huge trees still draw quickly
+TREEMAP_REDRAW_DELAY = 250  # Milliseconds between redraws while folders are being measured
+TREEMAP_COLORS = ('#9ab8dc', '#a8d5a2', '#f2c28b', '#d9a6c9', '#c7c28a', '#8fcfcf', '#e5a3a3', '#b7aee0')
+
+# Duplicate finder settings
+DUPLICATE_EDGE_BLOCK = 64 * 1024  # Bytes hashed from each end of a file before hashing all of it
+DUPLICATE_HASH_CHUNK = 1024 * 1024
+DUPLICATE_HASH_WINDOW = 8  # Hash tasks queued at once, so a scan doesn't crowd out other disk reads
+DUPLICATE_HASH_CACHE = os.path.join(os.path.dirname(__file__), "file_hash_cache.json")
+
+
+def get_ffmpeg_path():
+    return os.path.join(os.path.dirname(__file__), "ffmpeg", "bin", "ffmpeg.exe")
+
+
+def get_vosk_model_path():
+    return os.path.join(os.path.dirname(__file__), "vosk-model", "vosk-model-small-en-us-0.15")
+
+
+def iter_caption_chunks(ffmpeg_path, file_path, info=None, target=CAPTION_CHUNK_SECONDS, window=CAPTION_CUT_WINDOW):
+    """Yield (start, end) chunks of roughly `target` seconds, cut in the middle of silences.
+
+    ffmpeg's silencedetect output is read while it runs, so each chunk is yielded as
+    soon as its cut point is known. The last chunk has an end of None (end of file).
+    If `info` is given, the media duration is stored in info['duration'].
+    """
+    cmd = [
+        ffmpeg_path,
+        '-i', file_path,
+        '-vn',
+        '-ac', '1',
+        '-ar', str(CAPTION_SAMPLE_RATE),
+        '-af', CAPTION_SILENCE_FILTER,
+        '-f', 'null',
+        '-'
+    ]
+    # Text mode turns ffmpeg's carriage-return progress lines into separate lines
+    proc = subprocess.Popen(
+        cmd,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        errors='replace',
+        creationflags=subprocess.CREATE_NO_WINDOW
+    )
+
+    chunk_start = 0.0
+    midpoints = []
+    silence_start = None
+    try:
+        for line in proc.stderr:
+            position = None
+            m = re.search(r'Duration: (\d+):(\d+):(\d+(?:\.\d+)?)', line)
+            if m and info is not None and 'duration' not in info:
+                info['duration'] = int(m.group(1)) * 3600 + int(m.group(2)) * 60 + float(m.group(3))
+            m = re.search(r'silence_start: (-?\d+(?:\.\d+)?)', line)
+            if m:
+                silence_start = max(0.0, float(m.group(1)))
+            m = re.search(r'silence_end: (\d+(?:\.\d+)?)', line)
+            if m and silence_start is not None:
+                position = float(m.group(1))
+                midpoints.append((silence_start + position) / 2)
+                silence_start = None
+            m = re.search(r'time=(\d+):(\d+):(\d+(?:\.\d+)?)', line)
+            if m:
+                position = int(m.group(1)) * 3600 + int(m.group(2)) * 60 + float(m.group(3))
+            if position is None:
+                continue
+
+            # Cut every chunk whose whole search window has been scanned
+            while position > chunk_start + target + window:
+                wanted = chunk_start + target
+                candidates = [t for t in midpoints if wanted - window <= t <= wanted + window]
+                cut = min(candidates, key=lambda t: abs(t - wanted)) if candidates else wanted
+                yield chunk_start, cut
+                chunk_start = cut
+                midpoints = [t for t in midpoints if t > cut]
+        proc.wait()
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+
+    yield chunk_start, None
+
+
+def probe_media(ffmpeg_path, file_path):
+    """Read duration, codecs, resolution and bitrate from the header ffmpeg prints for `file_path`"""
+    result = subprocess.run(
+        [ffmpeg_path, '-hide_banner', '-i', file_path],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        errors='replace',
+        creationflags=subprocess.CREATE_NO_WINDOW
+    )
+    info = {}
+    for line in result.stderr.splitlines():
+        m = re.search(r'Duration: (\d+):(\d+):(\d+(?:\.\d+)?)', line)
+        if m:
+            info['duration'] = int(m.group(1)) * 3600 + int(m.group(2)) * 60 + float(m.group(3))
+        m = re.search(r'bitrate: (\d+) kb/s', line)
+        if m and 'Duration:' in line:
+            info['bitrate'] = int(m.group(1))
+        # Cover art of audio files shows up as a video stream
+        m = re.search(r'Stream #.*?: Video: (\w+)', line)
+        if m and 'attached pic' not in line and 'video_codec' not in info:
+            info['video_codec'] = m.group(1)
+            size = re.search(r', (\d{2,5})x(\d{2,5})', line)
+            if size:
+                info['width'], info['height'] = int(size.group(1)), int(size.group(2))
+        m = re.search(r'Stream #.*?: Audio: (\w+)', line)
+        if m and 'audio_codec' not in info:
+            info['audio_codec'] = m.group(1)
+    if 'duration' not in info:
+        raise ValueError(f"ffmpeg could not read {file_path}")
+    return info
+
+
+def format_duration(seconds):
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
+
+
+def format_media_probe(info):
+    """Values for the tree's media columns"""
+    codecs = "/".join(info[key] for key in ('video_codec', 'audio_codec') if key in info)
+    resolution = f"{info['width']}x{info['height']}" if 'width' in info else ""
+    bitrate = f"{info['bitrate']} kb/s" if 'bitrate' in info else ""
+    return format_duration(info['duration']), codecs, resolution, bitrate
+
+
+def compute_waveform_peaks(ffmpeg_path, file_path, cancel_event=None):
+    """Decode a file's audio to mono PCM and reduce it to min/max pairs as it streams in.
+
+    Returns (mins, maxs) int16 arrays with WAVEFORM_PEAKS_PER_SECOND pairs per second
+    of audio, or None if cancelled or the file has no audio.
+    """
+    cmd = [
+        ffmpeg_path, '-loglevel', 'error', '-i', file_path,
+        '-vn',
+        '-ac', '1',
+        '-ar', str(WAVEFORM_SAMPLE_RATE),
+        '-f', 's16le',
+        '-'
+    ]
+    block = WAVEFORM_SAMPLE_RATE // WAVEFORM_PEAKS_PER_SECOND * 2  # Bytes of audio per peak pair
+    proc = subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        creationflags=subprocess.CREATE_NO_WINDOW
+    )
+    mins = []
+    maxs = []
+    try:
+        leftover = b''
+        while True:
+            if cancel_event is not None and cancel_event.is_set():
+                return None
+            data = proc.stdout.read(block * 4096)
+            if not data:
+                break
+            data = leftover + data
+            usable = len(data) - len(data) % block
+            leftover = data[usable:]
+            if usable:
+                samples = np.frombuffer(data[:usable], dtype=np.int16).reshape(-1, block // 2)
+                mins.append(samples.min(axis=1))
+                maxs.append(samples.max(axis=1))
+        if len(leftover) >= 2:
+            samples = np.frombuffer(leftover[:len(leftover) - len(leftover) % 2], dtype=np.int16)
+            mins.append(samples.min(keepdims=True))
+            maxs.append(samples.max(keepdims=True))
+        proc.wait()
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+    if not mins:
+        return None
+    return np.concatenate(mins), np.concatenate(maxs)
+
+
+def reduce_waveform_peaks(mins, maxs, buckets):
+    """Merge min/max pairs down to `buckets` pairs (or keep them all if there are fewer)"""
+    if len(mins) <= buckets:
+        return mins, maxs
+    edges = np.linspace(0, len(mins), buckets + 1).astype(np.int64)[:-1]
+    return np.minimum.reduceat(mins, edges), np.maximum.reduceat(maxs, edges)
+
+
+def get_waveform_levels(ffmpeg_path, file_path, cancel_event=None):
+    """Return {buckets: (mins, maxs)} from the cache, computing and caching it on a miss. None if cancelled."""
+    cache_path = get_waveform_cache_path(file_path)
+    levels = load_waveform_cache(cache_path)
+    if levels is None:
+        peaks = compute_waveform_peaks(ffmpeg_path, file_path, cancel_event)
+        if peaks is None:
+            return None
+        levels = {buckets: reduce_waveform_peaks(*peaks, buckets) for buckets in WAVEFORM_RESOLUTIONS}
+        save_waveform_cache(cache_path, levels)
+    return levels
+
+
+def get_waveform_cache_path(file_path):
+    stat = os.stat(file_path)
+    key = "|".join([str(stat.st_size), str(stat.st_mtime_ns), sampled_file_hash(file_path)])
+    return os.path.join(WAVEFORM_CACHE_DIR, hashlib.sha256(key.encode()).hexdigest() + ".npz")
+
+
+def load_waveform_cache(cache_path):
+    """Return {buckets: (mins, maxs)} for every cached resolution, or None"""
+    try:
+        with np.load(cache_path) as data:
+            return {buckets: (data[f'min{buckets}'], data[f'max{buckets}']) for buckets in WAVEFORM_RESOLUTIONS}
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Error loading waveform cache: {e}")
+        return None
+
+
+def save_waveform_cache(cache_path, levels):
+    os.makedirs(WAVEFORM_CACHE_DIR, exist_ok=True)
+    arrays = {}
+    for buckets, (mins, maxs) in levels.items():
+        arrays[f'min{buckets}'] = mins
+        arrays[f'max{buckets}'] = maxs
+    temp_path = cache_path + '.tmp'
+    with open(temp_path, 'wb') as file:
+        np.savez(file, **arrays)
+    os.replace(temp_path, cache_path)
+
+
+def extract_keyframe_thumbnails(ffmpeg_path, file_path, interval, cancel_event=None):
+    """Decode only the keyframes of a video, keeping one about every `interval` seconds.
+
+    Frames come out of ffmpeg as raw RGB at THUMBNAIL_WIDTH x THUMBNAIL_HEIGHT, and
+    their timestamps are read from the showinfo filter's log. Returns (times, images),
+    or None if cancelled.
+    """
+    size = f"{THUMBNAIL_WIDTH}:{THUMBNAIL_HEIGHT}"
+    filters = ",".join([
+        f"select='isnan(prev_selected_t)+gte(t-prev_selected_t,{interval})'",
+        f"scale={size}:force_original_aspect_ratio=decrease",
+        f"pad={size}:(ow-iw)/2:(oh-ih)/2",
+        "showinfo"
+    ])
+    cmd = [
+        ffmpeg_path, '-hide_banner', '-nostats',
+        '-skip_frame', 'nokey',  # Keyframes need no other frames to decode
+        '-i', file_path,
+        '-an',
+        '-vf', filters,
+        '-vsync', 'vfr',
+        '-f', 'rawvideo',
+        '-pix_fmt', 'rgb24',
+        '-'
+    ]
+    proc = subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        creationflags=subprocess.CREATE_NO_WINDOW | subprocess.BELOW_NORMAL_PRIORITY_CLASS
+    )
+
+    # The log is read on its own thread so a full stderr pipe can't stall the frames
+    times = []
+
+    def read_log():
+        for line in proc.stderr:
+            m = re.search(rb'Parsed_showinfo.*?pts_time:\s*(\d+(?:\.\d+)?)', line)
+            if m:
+                times.append(float(m.group(1)))
+
+    log_thread = threading.Thread(target=read_log, daemon=True)
+    log_thread.start()
+
+    images = []
+    frame_size = THUMBNAIL_WIDTH * THUMBNAIL_HEIGHT * 3
+    try:
+        while True:
+            if cancel_event is not None and cancel_event.is_set():
+                return None
+            data = proc.stdout.read(frame_size)
+            if len(data) < frame_size:
+                break
+            images.append(Image.frombytes('RGB', (THUMBNAIL_WIDTH, THUMBNAIL_HEIGHT), data))
+        proc.wait()
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+    log_thread.join()
+
+    count = min(len(times), len(images))
+    return times[:count], images[:count]
+
+
+def get_thumbnail_strip(ffmpeg_path, file_path, duration=None, cancel_event=None):
+    """Return (times, sprite) from the cache, extracting and caching them on a miss. None if cancelled."""
+    cache_path = get_thumbnail_cache_path(file_path)
+    cached = load_thumbnail_cache(cache_path)
+    if cached is not None:
+        return cached
+    if not duration:
+        duration = probe_media(ffmpeg_path, file_path)['duration']
+    interval = max(THUMBNAIL_MIN_INTERVAL, duration / THUMBNAIL_COUNT)
+    result = extract_keyframe_thumbnails(ffmpeg_path, file_path, interval, cancel_event)
+    if not result or not result[0]:
+        return None
+    times, images = result
+    sprite = build_thumbnail_sprite(images)
+    save_thumbnail_cache(cache_path, times, sprite)
+    return times, sprite
+
+
+def get_thumbnail_cache_path(file_path):
+    """Base path of a video's cached sprite (.jpg) and keyframe times (.json)"""
+    stat = os.stat(file_path)
+    key = "|".join([str(stat.st_size), str(stat.st_mtime_ns), sampled_file_hash(file_path)])
+    return os.path.join(THUMBNAIL_CACHE_DIR, hashlib.sha256(key.encode()).hexdigest())
+
+
+def load_thumbnail_cache(cache_path):
+    """Return (times, sprite), or None if the video has no cached thumbnails"""
+    try:
+        with open(cache_path + '.json', 'r', encoding='utf-8') as file:
+            times = json.load(file)['times']
+        with Image.open(cache_path + '.jpg') as sprite:
+            sprite.load()
+            return times, sprite.copy()
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Error loading thumbnail cache: {e}")
+        return None
+
+
+def save_thumbnail_cache(cache_path, times, sprite):
+    os.makedirs(THUMBNAIL_CACHE_DIR, exist_ok=True)
+    temp_path = cache_path + '.jpg.tmp'
+    sprite.save(temp_path, format='JPEG', quality=80)
+    os.replace(temp_path, cache_path + '.jpg')
+    # Written last, so a sprite is only used once its times are known
+    write_json_atomic(cache_path + '.json', {'times': times})
+
+
+def build_thumbnail_sprite(images):
+    """Paste the thumbnails side by side into one image"""
+    sprite = Image.new('RGB', (THUMBNAIL_WIDTH * len(images), THUMBNAIL_HEIGHT))
+    for i, image in enumerate(images):
+        sprite.paste(image, (i * THUMBNAIL_WIDTH, 0))
+    return sprite
+
+
+def read_text_file(file_path, cancel_event=None):
+    """Read a text file in chunks so a cancelled load stops early. None if cancelled."""
+    for encoding in ('utf-8', 'latin-1'):
+        chunks = []
+        try:
+            with open(file_path, 'r', encoding=encoding) as file:
+                while True:
+                    if cancel_event is not None and cancel_event.is_set():
+                        return None
+                    chunk = file.read(TEXT_READ_CHUNK)
+                    if not chunk:
+                        return "".join(chunks)
+                    chunks.append(chunk)
+        except UnicodeDecodeError:
+            continue
+
+
+def read_csv_file(file_path, cancel_event=None):
+    """Return (headers, rows) of a simple comma separated file, or None if cancelled"""
+    content = read_text_file(file_path, cancel_event)
+    if content is None:
+        return None
+    lines = content.splitlines()
+    if not lines:
+        return [], []
+    headers = [col.strip() for col in lines[0].split(',')]
+    rows = [[val.strip() for val in line.split(',')] for line in lines[1:]]
+    return headers, rows
+
+
+def load_image_file(file_path, max_size, cancel_event=None):
+    """Decode an image, shrunk to fit max_size - it is never shown larger than the screen.
+
+    Returns None if cancelled. The decode itself can't be interrupted, so the token is
+    checked around it, and JPEGs are decoded straight at a reduced scale.
+    """
+    if cancel_event is not None and cancel_event.is_set():
+        return None
+    img = Image.open(file_path)
+    img.draft(img.mode, max_size)  # Only JPEG supports this; other formats ignore it
+    if cancel_event is not None and cancel_event.is_set():
+        img.close()
+        return None
+    img.load()
+    if cancel_event is not None and cancel_event.is_set():
+        return None
+    if img.width > max_size[0] or img.height > max_size[1]:
+        img.thumbnail(max_size, Image.LANCZOS)
+    return img
+
+
+# PyMuPDF is not thread-safe, so only one thread renders at a time
+pdf_lock = threading.Lock()
+
+
+def render_pdf_document(file_path, zoom, page_numbers=None, fit_height=None, cancel_event=None, on_page=None):
+    """Render pages of a PDF to PPM data, calling on_page(page_number, data) as each one finishes.
+
+    All pages are rendered if page_numbers is None, and numbers past the last page are
+    skipped. With fit_height, pages are scaled to that height before the zoom is applied.
+    Returns the document's page count, or None if cancelled.
+    """
+    with pdf_lock:
+        doc = fitz.open(file_path)
+        try:
+            for page_num in (range(len(doc)) if page_numbers is None else page_numbers):
+                if page_num >= len(doc):
+                    continue
+                if cancel_event is not None and cancel_event.is_set():
+                    return None
+                page = doc.load_page(page_num)
+                page_zoom = zoom if fit_height is None else (fit_height - 20) / page.rect.height * zoom
+                pix = page.get_pixmap(matrix=fitz.Matrix(page_zoom, page_zoom))
+                if on_page is not None:
+                    on_page(page_num, pix.tobytes("ppm"))
+            return len(doc)
+        finally:
+            doc.close()
+
+
+def read_text_head(file_path, cancel_event=None):
+    """Read just the first TEXT_READ_CHUNK characters of a text file. None if cancelled."""
+    for encoding in ('utf-8', 'latin-1'):
+        chunks = []
+        try:
+            with open(file_path, 'r', encoding=encoding) as file:
+                remaining = TEXT_READ_CHUNK
+                while remaining > 0:
+                    if cancel_event is not None and cancel_event.is_set():
+                        return None
+                    chunk = file.read(min(TEXT_HEAD_BLOCK, remaining))
+                    if not chunk:
+                        break
+                    chunks.append(chunk)
+                    remaining -= len(chunk)
+                return "".join(chunks)
+        except UnicodeDecodeError:
+            continue
+
+
+def render_pdf_preview(file_path, cancel_event=None):
+    """The first PREFETCH_PDF_PAGES pages at 100% zoom, as shown when a PDF is opened.
+
+    Returns {'pages': [ppm data], 'page_count': n}, or None if cancelled.
+    """
+    pages = []
+    page_count = render_pdf_document(file_path, 1.0, range(PREFETCH_PDF_PAGES), cancel_event=cancel_event,
+                                     on_page=lambda page_num, data: pages.append(data))
+    if page_count is None:
+        return None
+    return {'pages': pages, 'page_count': page_count}
+
+
+def estimate_content_size(value):
+    """Rough number of bytes a decoded file's content takes in memory"""
+    if isinstance(value, Image.Image):
+        return value.width * value.height * len(value.getbands())
+    if isinstance(value, dict):
+        return sum(estimate_content_size(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_content_size(item) for item in value)
+    return sys.getsizeof(value)
+
+
+def scan_directory(directory_path):
+    """List a folder's non-hidden entries as (is_dir, name, path, size, mtime), folders first, each sorted by name.
+
+    On Windows os.scandir gets the type, size and modified time with the listing
+    itself, so there is no stat call per entry.
+    """
+    entries = []
+    with os.scandir(directory_path) as it:
+        for entry in it:
+            if entry.name.startswith('.'):  # Skip hidden files
+                continue
+            try:
+                is_dir = entry.is_dir()
+                stat = entry.stat()
+                size, mtime = stat.st_size, stat.st_mtime
+            except OSError:
+                is_dir, size, mtime = False, 0, 0
+            entries.append((is_dir, entry.name, entry.path, size, mtime))
+    entries.sort(key=lambda entry: (not entry[0], entry[1]))
+    return entries
+
+
+def compute_folder_sizes(directory_path, mtime, cancel_event=None, on_folder=None):
+    """Total the file sizes under a folder, returning {path: (mtime, size)} for it and every folder below.
+
+    on_folder(path, mtime, size) is called as soon as each folder's own subtree is done.
+    Symlinked folders are not followed. Returns None if cancelled.
+    """
+    sizes = {}
+
+    def walk(path, path_mtime):
+        if cancel_event is not None and cancel_event.is_set():
+            return None
+        total = 0
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            size = walk(entry.path, entry.stat(follow_symlinks=False).st_mtime)
+                            if size is None:
+                                return None
+                            total += size
+                        else:
+                            total += entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        sizes[path] = (path_mtime, total)
+        if on_folder is not None:
+            on_folder(path, path_mtime, total)
+        return total
+
+    if walk(directory_path, mtime) is None:
+        return None
+    return sizes
+
+
+def format_modified(mtime):
+    return time.strftime('%Y-%m-%d %H:%M', time.localtime(mtime)) if mtime else ""
+
+
+def format_file_type(name, is_dir):
+    if is_dir:
+        return "Folder"
+    ext = os.path.splitext(name)[1]
+    return ext[1:].upper() if ext else "File"
+
+
+def has_directory_contents(directory_path):
+    with os.scandir(directory_path) as it:
+        return any(not entry.name.startswith('.') and (entry.is_dir() or entry.is_file()) for entry in it)
+
+
+def format_size(size):
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.2f} GB"
+
+
+def photo_size(width, height):
+    """Bytes Tk keeps for a PhotoImage of this size (four bytes a pixel)"""
+    return width * height * 4
+
+
+def read_measured(read, *args):
+    """Call read(*args) and return (result, estimated size), sizing it on the worker thread"""
+    result = read(*args)
+    return result, (estimate_content_size(result) if result is not None else 0)
+
+
+def write_json_atomic(path, data):
+    """Write JSON to a temp file and rename it over `path` so readers never see a partial file"""
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as file:
+        json.dump(data, file)
+    os.replace(temp_path, path)
+
+
+def sampled_file_hash(file_path, sample_size=HASH_SAMPLE_SIZE, samples=HASH_SAMPLE_COUNT):
+    """Hash a few evenly spaced blocks of a file instead of reading all of it"""
+    size = os.path.getsize(file_path)
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        if size <= sample_size * samples:
+            digest.update(file.read())
+        else:
+            for i in range(samples):
+                file.seek((size - sample_size) * i // (samples - 1))
+                digest.update(file.read(sample_size))
+    return digest.hexdigest()
+
+
+def squarify(values, x, y, width, height):
+    """Lay out rectangles with the given areas (largest first) in a box, keeping them close to square.
+
+    Returns one (x, y, width, height) per value, in the same order.
+    """
+    total = sum(values)
+    if total <= 0 or width <= 0 or height <= 0:
+        return []
+    scale = width * height / total
+    areas = [value * scale for value in values]
+
+    def worst(row, side):
+        row_sum = sum(row)
+        return max(max(row) * side * side / (row_sum * row_sum), row_sum * row_sum / (side * side * min(row)))
+
+    rects = []
+    i = 0
+    while i < len(areas):
+        side = min(width, height)
+        row = [areas[i]]
+        i += 1
+        while i < len(areas) and areas[i] > 0 and worst(row + [areas[i]], side) <= worst(row, side):
+            row.append(areas[i])
+            i += 1
+        row_sum = sum(row)
+        if width >= height:  # Fill a column on the left
+            column_width = row_sum / height
+            top = y
+            for area in row:
+                rects.append((x, top, column_width, area / column_width))
+                top += area / column_width
+            x += column_width
+            width -= column_width
+        else:  # Fill a row along the top
+            row_height = row_sum / width
+            left = x
+            for area in row:
+                rects.append((left, y, area / row_height, row_height))
+                left += area / row_height
+            y += row_height
+            height -= row_height
+    return rects
+
+
+def hash_password(password, n=None, r=None, p=None):
+    """Return a salted scrypt hash as 'scrypt$n$r$p$salt$hash' - slow on purpose, so call it off the Tk thread"""
+    n, r, p = n or PASSWORD_SCRYPT_N, r or PASSWORD_SCRYPT_R, p or PASSWORD_SCRYPT_P
+    salt = secrets.token_bytes(PASSWORD_SALT_BYTES)
+    key = hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, maxmem=256 * n * r * p, dklen=32)
+    return "$".join(['scrypt', str(n), str(r), str(p),
+                     base64.b64encode(salt).decode(), base64.b64encode(key).decode()])
+
+
+def check_password(password, stored):
+    """Compare a password with a stored hash. Returns (matches, needs_rehash).
+
+    Hashes from before salting are plain SHA-256 hex digests; they match as before
+    but always need rehashing, as do scrypt hashes made with an older cost.
+    """
+    if not stored.startswith('scrypt$'):
+        digest = hashlib.sha256(password.encode()).hexdigest()
+        return hmac.compare_digest(digest, stored), True
+    _, n, r, p, salt, key = stored.split('$')
+    n, r, p = int(n), int(r), int(p)
+    derived = hashlib.scrypt(password.encode(), salt=base64.b64decode(salt), n=n, r=r, p=p,
+                             maxmem=256 * n * r * p, dklen=32)
+    outdated = (n, r, p) != (PASSWORD_SCRYPT_N, PASSWORD_SCRYPT_R, PASSWORD_SCRYPT_P)
+    return hmac.compare_digest(derived, base64.b64decode(key)), outdated
+
+
+def partial_file_hash(file_path, cancel_event=None):
+    """Hash the first and last DUPLICATE_EDGE_BLOCK bytes - files that differ almost always differ there.
+
+    Files no longer than two blocks are hashed whole, so for them this is the full hash.
+    Returns None if cancelled.
+    """
+    digest = hashlib.blake2b()
+    with open(file_path, 'rb') as file:
+        if cancel_event is not None and cancel_event.is_set():
+            return None
+        digest.update(file.read(DUPLICATE_EDGE_BLOCK))
+        size = file.seek(0, os.SEEK_END)
+        if size > DUPLICATE_EDGE_BLOCK:
+            if cancel_event is not None and cancel_event.is_set():
+                return None
+            file.seek(max(DUPLICATE_EDGE_BLOCK, size - DUPLICATE_EDGE_BLOCK))
+            digest.update(file.read(DUPLICATE_EDGE_BLOCK))
+    return digest.hexdigest()
+
+
+def full_file_hash(file_path, cancel_event=None):
+    """Hash a whole file in chunks, or return None if cancelled part way"""
+    digest = hashlib.blake2b()
+    with open(file_path, 'rb') as file:
+        while True:
+            if cancel_event is not None and cancel_event.is_set():
+                return None
+            chunk = file.read(DUPLICATE_HASH_CHUNK)
+            if not chunk:
+                return digest.hexdigest()
+            digest.update(chunk)
+
+
+def get_model_identity(model_path):
+    return f"{os.path.basename(model_path)}@{int(os.path.getmtime(model_path))}"
+
+
+def get_caption_cache_path(file_path, model_path):
+    stat = os.stat(file_path)
+    key = "|".join([
+        str(stat.st_size),
+        str(stat.st_mtime_ns),
+        sampled_file_hash(file_path),
+        get_model_identity(model_path)
+    ])
+    return os.path.join(CAPTION_CACHE_DIR, hashlib.sha256(key.encode()).hexdigest() + ".json")
+
+
+def load_caption_cache(cache_path):
+    """Return the cached word list, or None if this file hasn't been transcribed yet"""
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as file:
+            return json.load(file)['words']
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Error loading caption cache: {e}")
+        return None
+
+
+class TranscriptIndex:
+    """Inverted index of every transcribed word, kept in SQLite next to the caption cache.
+
+    Each word is stored with its position in the transcript, so multi-word queries
+    are matched as phrases.
+    """
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        self.conn = None
+
+    def connect(self):
+        if self.conn is None:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS media (
+                    id INTEGER PRIMARY KEY,
+                    path TEXT NOT NULL,
+                    norm_path TEXT NOT NULL UNIQUE,
+                    cache_file TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS postings (
+                    word TEXT NOT NULL,
+                    media_id INTEGER NOT NULL,
+                    position INTEGER NOT NULL,
+                    start REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS postings_word ON postings (word);
+                CREATE INDEX IF NOT EXISTS postings_media ON postings (media_id, position);
+            """)
+        return self.conn
+
+    def add_transcript(self, file_path, cache_file, words):
+        norm_path = os.path.normcase(os.path.abspath(os.path.normpath(file_path)))
+        with self.lock:
+            conn = self.connect()
+            with conn:
+                row = conn.execute('SELECT id, cache_file FROM media WHERE norm_path = ?', (norm_path,)).fetchone()
+                if row and row[1] == cache_file:
+                    return  # Already indexed
+                if row:
+                    # The file changed and was transcribed again
+                    media_id = row[0]
+                    conn.execute('DELETE FROM postings WHERE media_id = ?', (media_id,))
+                    conn.execute('UPDATE media SET path = ?, cache_file = ? WHERE id = ?', (file_path, cache_file, media_id))
+                else:
+                    media_id = conn.execute('INSERT INTO media (path, norm_path, cache_file) VALUES (?, ?, ?)',
+                                            (file_path, norm_path, cache_file)).lastrowid
+                conn.executemany('INSERT INTO postings (word, media_id, position, start) VALUES (?, ?, ?, ?)',
+                                 ((word['word'].lower(), media_id, position, word['start'])
+                                  for position, word in enumerate(words)))
+
+    def indexed_cache_files(self):
+        with self.lock:
+            return {row[0] for row in self.connect().execute('SELECT cache_file FROM media')}
+
+    def search(self, query, root=None, limit=TRANSCRIPT_SEARCH_LIMIT):
+        """Return [(path, seconds, context)] for every place the phrase was said under `root`"""
+        terms = query.lower().split()
+        if not terms:
+            return []
+
+        sql = 'SELECT m.path, p0.start, p0.media_id, p0.position FROM postings p0 JOIN media m ON m.id = p0.media_id'
+        params = []
+        for i, term in enumerate(terms[1:], 1):
+            sql += f' JOIN postings p{i} ON p{i}.media_id = p0.media_id AND p{i}.position = p0.position + {i} AND p{i}.word = ?'
+            params.append(term)
+        sql += ' WHERE p0.word = ?'
+        params.append(terms[0])
+        if root:
+            prefix = os.path.normcase(os.path.abspath(os.path.normpath(root))).rstrip(os.sep) + os.sep
+            sql += ' AND m.norm_path >= ? AND m.norm_path < ?'
+            params += [prefix, prefix + '\uffff']
+        sql += ' ORDER BY m.path, p0.start LIMIT ?'
+        params.append(limit)
+
+        with self.lock:
+            conn = self.connect()
+            hits = []
+            for path, start, media_id, position in conn.execute(sql, params).fetchall():
+                context = conn.execute(
+                    'SELECT word FROM postings WHERE media_id = ? AND position BETWEEN ? AND ? ORDER BY position',
+                    (media_id, position - TRANSCRIPT_CONTEXT_WORDS, position + len(terms) - 1 + TRANSCRIPT_CONTEXT_WORDS)
+                ).fetchall()
+                hits.append((path, start, ' '.join(row[0] for row in context)))
+            return hits
+
+
+transcript_index = TranscriptIndex(TRANSCRIPT_INDEX_PATH)
+
+
+class StateStore:
+    """The app's persistent state - locks, hidden items, settings - in one SQLite file.
+
+    Rows are (namespace, key, JSON value), so a change writes only the keys it touches,
+    in a WAL transaction that a crash can't leave half done. Path keys are normalized,
+    which lets under() find everything below a folder with a range query.
+    """
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        self.conn = None
+
+    def connect(self):
+        if self.conn is None:
+            self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('PRAGMA synchronous=NORMAL')  # Durable enough in WAL mode, and much faster
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS state (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                ) WITHOUT ROWID
+            """)
+            self.migrate_json_files()
+        return self.conn
+
+    def migrate_json_files(self):
+        """Move the old JSON files into the store. They used to be opened relative to the working
+        directory, so both it and the script's folder are checked.
+        """
+        for namespace, name in STATE_LEGACY_FILES.items():
+            for path in {os.path.abspath(name), os.path.join(os.path.dirname(os.path.abspath(__file__)), name)}:
+                if not os.path.exists(path):
+                    continue
+                try:
+                    with open(path, 'r', encoding='utf-8') as file:
+                        data = json.load(file)
+                    if namespace != 'settings':
+                        data = {os.path.normcase(os.path.abspath(os.path.normpath(key))): value
+                                for key, value in data.items()}
+                    with self.conn:
+                        # Keys already in the store are newer than the file
+                        self.conn.executemany(
+                            'INSERT OR IGNORE INTO state (namespace, key, value) VALUES (?, ?, ?)',
+                            ((namespace, key, json.dumps(value)) for key, value in data.items()))
+                    os.replace(path, path + '.migrated')
+                except Exception as e:
+                    print(f"Error migrating {path}: {e}")
+
+    def get_all(self, namespace):
+        with self.lock:
+            rows = self.connect().execute('SELECT key, value FROM state WHERE namespace = ?', (namespace,))
+            return {key: json.loads(value) for key, value in rows}
+
+    def under(self, namespace, folder):
+        """Entries whose key is a path below `folder`"""
+        prefix = os.path.normcase(os.path.abspath(os.path.normpath(folder))).rstrip(os.sep) + os.sep
+        with self.lock:
+            rows = self.connect().execute(
+                'SELECT key, value FROM state WHERE namespace = ? AND key >= ? AND key < ?',
+                (namespace, prefix, prefix + '\uffff'))
+            return {key: json.loads(value) for key, value in rows}
+
+    def update(self, namespace, changed=None, removed=()):
+        """Upsert `changed` and delete `removed` keys in one transaction"""
+        with self.lock:
+            conn = self.connect()
+            with conn:
+                if changed:
+                    conn.executemany(
+                        'INSERT INTO state (namespace, key, value) VALUES (?, ?, ?) '
+                        'ON CONFLICT (namespace, key) DO UPDATE SET value = excluded.value',
+                        ((namespace, key, json.dumps(value)) for key, value in changed.items()))
+                if removed:
+                    conn.executemany('DELETE FROM state WHERE namespace = ? AND key = ?',
+                                     ((namespace, key) for key in removed))
+
+
+state_store = StateStore(STATE_DB_PATH)
+
+
+class PasswordVerifier:
+    """Checks passwords against stored hashes, remembering correct ones for a while.
+
+    Items locked together share a hash, so unlocking them one after another only
+    derives the key once. Remembered passwords are kept as an HMAC under a key that
+    only lives for this session, never as the password itself. Thread-safe.
+    """
+    def __init__(self, ttl=PASSWORD_VERIFY_CACHE_SECONDS):
+        self.ttl = ttl
+        self.session_key = secrets.token_bytes(32)
+        self.recent = {}  # HMAC of (stored hash, password) -> time it stops being trusted
+        self.lock = threading.Lock()
+
+    def verify(self, password, stored):
+        """Returns (matches, new_hash) - new_hash replaces an outdated stored hash, else it is None"""
+        token = hmac.new(self.session_key, stored.encode() + b'\0' + password.encode(), hashlib.sha256).digest()
+        now = time.monotonic()
+        with self.lock:
+            if self.recent.get(token, 0) > now:
+                return True, None
+        matches, needs_rehash = check_password(password, stored)
+        if not matches:
+            return False, None
+        with self.lock:
+            self.recent = {key: expiry for key, expiry in self.recent.items() if expiry > now}
+            self.recent[token] = now + self.ttl
+        return True, (hash_password(password) if needs_rehash else None)
+
+
+password_verifier = PasswordVerifier()
+
+
+def index_cached_transcripts():
+    """Add transcripts cached before the index existed (or by an interrupted run) to the index"""
+    try:
+        names = os.listdir(CAPTION_CACHE_DIR)
+    except FileNotFoundError:
+        return
+    indexed = transcript_index.indexed_cache_files()
+    for name in names:
+        if not name.endswith('.json') or name in indexed or name == os.path.basename(CAPTION_BATCH_MANIFEST):
+            continue
+        try:
+            with open(os.path.join(CAPTION_CACHE_DIR, name), 'r', encoding='utf-8') as file:
+                entry = json.load(file)
+            transcript_index.add_transcript(entry['file'], name, entry['words'])
+        except Exception as e:
+            print(f"Error indexing {name}: {e}")
+
+
+def save_caption_cache(cache_path, file_path, model_path, words):
+    try:
+        os.makedirs(CAPTION_CACHE_DIR, exist_ok=True)
+        write_json_atomic(cache_path, {
+            'file': file_path,
+            'model': get_model_identity(model_path),
+            'words': words
+        })
+    except Exception as e:
+        print(f"Error saving caption cache: {e}")
+    try:
+        transcript_index.add_transcript(file_path, os.path.basename(cache_path), words)
+    except Exception as e:
+        print(f"Error indexing transcript: {e}")
+
+
+def group_caption_segments(words, interval):
+    """Group recognized words into "[HH:MM:SS] text" lines of `interval` seconds"""
+    results = []
+    current_segment = []
+    current_segment_start = 0
+
+    def add_segment():
+        timestamp = "{:02d}:{:02d}:{:02d}".format(
+            int(current_segment_start//3600),
+            int((current_segment_start%3600)//60),
+            int(current_segment_start%60)
+        )
+        results.append(f"[{timestamp}] {' '.join(current_segment)}\n")
+
+    for word in words:
+        # If this is the first word or we've reached the interval
+        if not current_segment or word['start'] >= current_segment_start + interval:
+            if current_segment:  # If we have a previous segment, format and add it
+                add_segment()
+                current_segment = []
+            # Align to the selected interval boundary
+            current_segment_start = word['start'] - (word['start'] % interval)
+
+        current_segment.append(word['word'])
+
+    # Add the final segment if it exists
+    if current_segment:
+        add_segment()
+
+    return results
+
+
+def format_caption_segments(words, interval):
+    return "\n".join(group_caption_segments(words, interval))  # Join with newlines between segments
+
+
+def format_cue_time(seconds, separator):
+    milliseconds = int(round(seconds * 1000))
+    hours, milliseconds = divmod(milliseconds, 3600000)
+    minutes, milliseconds = divmod(milliseconds, 60000)
+    secs, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{milliseconds:03d}"
+
+
+class CaptionTrack:
+    """Word timings of a transcript kept in flat arrays, plus the subtitle cues built from them"""
+    MAX_CUE_SECONDS = 5.0
+    MAX_CUE_CHARS = 84
+    MAX_CUE_GAP = 1.0  # A pause longer than this always starts a new cue
+
+    def __init__(self, words):
+        self.words = [word['word'] for word in words]
+        self.starts = array('d', (word['start'] for word in words))
+        self.ends = array('d', (word['end'] for word in words))
+
+        self.cue_starts = array('d')
+        self.cue_ends = array('d')
+        self.cue_texts = []
+        self.build_cues()
+
+    def build_cues(self):
+        first = None
+        length = 0
+        for i, word in enumerate(self.words):
+            if first is not None and (
+                    self.ends[i] - self.starts[first] > self.MAX_CUE_SECONDS
+                    or length + 1 + len(word) > self.MAX_CUE_CHARS
+                    or self.starts[i] - self.ends[i - 1] > self.MAX_CUE_GAP):
+                self.add_cue(first, i)
+                first = None
+            if first is None:
+                first = i
+                length = len(word)
+            else:
+                length += 1 + len(word)
+        if first is not None:
+            self.add_cue(first, len(self.words))
+
+    def add_cue(self, first, last):
+        self.cue_starts.append(self.starts[first])
+        self.cue_ends.append(self.ends[last - 1])
+        self.cue_texts.append(' '.join(self.words[first:last]))
+
+    def iter_words(self):
+        for word, start in zip(self.words, self.starts):
+            yield {'word': word, 'start': start}
+
+    def cue_at(self, seconds):
+        """Index of the cue on screen at `seconds`, or -1 - a binary search over the cue start times"""
+        i = bisect.bisect_right(self.cue_starts, seconds) - 1
+        if i >= 0 and seconds < self.cue_ends[i]:
+            return i
+        return -1
+
+    def to_srt(self):
+        cues = []
+        for number, (start, end, text) in enumerate(zip(self.cue_starts, self.cue_ends, self.cue_texts), 1):
+            cues.append(f"{number}\n{format_cue_time(start, ',')} --> {format_cue_time(end, ',')}\n{text}\n")
+        return "\n".join(cues)
+
+    def to_webvtt(self):
+        cues = ["WEBVTT\n"]
+        for start, end, text in zip(self.cue_starts, self.cue_ends, self.cue_texts):
+            cues.append(f"{format_cue_time(start, '.')} --> {format_cue_time(end, '.')}\n{text}\n")
+        return "\n".join(cues)
+
+
+class CaptionCancelled(Exception):
+    pass
+
+
+# Vosk models take seconds to load, so every process keeps each model it has used,
+# along with a pool of idle recognizers that are ready to take a new stream
+_vosk_models = {}
+_recognizer_pools = {}
+_vosk_lock = threading.Lock()
+
+
+def get_vosk_model(model_path):
+    with _vosk_lock:
+        model = _vosk_models.get(model_path)
+        if model is None:
+            model = Model(model_path)
+            _vosk_models[model_path] = model
+        return model
+
+
+def acquire_recognizer(model_path, sample_rate=CAPTION_SAMPLE_RATE):
+    with _vosk_lock:
+        idle = _recognizer_pools.get((model_path, sample_rate))
+        if idle:
+            return idle.pop()
+    rec = KaldiRecognizer(get_vosk_model(model_path), sample_rate)
+    rec.SetWords(True)
+    return rec
+
+
+def release_recognizer(model_path, rec, sample_rate=CAPTION_SAMPLE_RATE):
+    rec.Reset()
+    with _vosk_lock:
+        _recognizer_pools.setdefault((model_path, sample_rate), []).append(rec)
+
+
+def _init_caption_worker(model_path):
+    # Load the model and one recognizer as soon as the worker process starts
+    release_recognizer(model_path, acquire_recognizer(model_path))
+
+
+# Caption worker processes stay alive between jobs so they only load the model once
+_caption_pools = {}
+_caption_pools_lock = threading.Lock()
+
+
+def get_available_memory():
+    """Free physical memory in bytes, or None if it can't be read"""
+    try:
+        if sys.platform == 'win32':
+            import ctypes
+
+            class MemoryStatus(ctypes.Structure):
+                _fields_ = [('dwLength', ctypes.c_ulong), ('dwMemoryLoad', ctypes.c_ulong),
+                            ('ullTotalPhys', ctypes.c_ulonglong), ('ullAvailPhys', ctypes.c_ulonglong),
+                            ('ullTotalPageFile', ctypes.c_ulonglong), ('ullAvailPageFile', ctypes.c_ulonglong),
+                            ('ullTotalVirtual', ctypes.c_ulonglong), ('ullAvailVirtual', ctypes.c_ulonglong),
+                            ('ullAvailExtendedVirtual', ctypes.c_ulonglong)]
+
+            status = MemoryStatus()
+            status.dwLength = ctypes.sizeof(MemoryStatus)
+            if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+                return status.ullAvailPhys
+            return None
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def get_caption_worker_count(model_path):
+    """How many caption workers fit in free memory - each one loads its own copy of the model"""
+    model_size = 0
+    for folder, _, files in os.walk(model_path):
+        for name in files:
+            try:
+                model_size += os.path.getsize(os.path.join(folder, name))
+            except OSError:
+                pass
+    available = get_available_memory()
+    if not model_size or available is None:
+        return CAPTION_WORKERS
+    return max(1, min(CAPTION_WORKERS, available // (model_size * CAPTION_WORKER_MEMORY_FACTOR)))
+
+
+def get_caption_pool(model_path):
+    """The worker pool for a model, created on the first caption request"""
+    with _caption_pools_lock:
+        pool = _caption_pools.get(model_path)
+        if pool is None:
+            pool = ProcessPoolExecutor(max_workers=get_caption_worker_count(model_path),
+                                       initializer=_init_caption_worker,
+                                       initargs=(model_path,))
+            _caption_pools[model_path] = pool
+        return pool
+
+
+def discard_caption_pool(model_path):
+    with _caption_pools_lock:
+        pool = _caption_pools.pop(model_path, None)
+    if pool:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+# The manager process hosts the queues and cancel events shared with the caption workers
+_caption_manager = None
+
+
+def get_caption_manager():
+    global _caption_manager
+    with _caption_pools_lock:
+        if _caption_manager is None:
+            _caption_manager = multiprocessing.Manager()
+        return _caption_manager
+
+
+def shutdown_caption_pools():
+    global _caption_manager
+    with _caption_pools_lock:
+        pools = list(_caption_pools.values())
+        _caption_pools.clear()
+        manager, _caption_manager = _caption_manager, None
+    for pool in pools:
+        pool.shutdown(wait=False, cancel_futures=True)
+    if manager:
+        manager.shutdown()
+
+
+def transcribe_caption_chunk(ffmpeg_path, model_path, file_path, start, end, index=0, updates=None, cancel_event=None):
+    """Transcribe [start, end) seconds of a media file, returning words with absolute timestamps.
+
+    ffmpeg decodes straight to raw 16-bit PCM on stdout, which is fed to the
+    recognizer as it arrives - nothing is written to disk. If an `updates` queue
+    is given, the chunk reports its finished words, partial text and seconds of
+    audio consumed while it runs. Setting `cancel_event` kills ffmpeg and stops.
+    """
+    cmd = [ffmpeg_path, '-loglevel', 'error', '-ss', str(start), '-i', file_path]
+    if end is not None:
+        cmd += ['-t', str(end - start)]
+    cmd += [
+        '-vn',
+        '-ac', '1',  # Mono audio
+        '-ar', str(CAPTION_SAMPLE_RATE),  # 16kHz sample rate
+        '-f', 's16le',
+        '-'
+    ]
+
+    words = []
+
+    def collect(result_json):
+        result = json.loads(result_json)
+        new_words = result.get('result', [])
+        for word in new_words:
+            word['start'] += start
+            word['end'] += start
+        words.extend(new_words)
+        if updates is not None and new_words:
+            updates.put(('words', index, new_words))
+
+    rec = acquire_recognizer(model_path)
+
+    proc = subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        creationflags=subprocess.CREATE_NO_WINDOW
+    )
+    try:
+        bytes_read = 0
+        next_update = CAPTION_UPDATE_SECONDS
+        last_partial = ""
+        while True:
+            if cancel_event is not None and cancel_event.is_set():
+                raise CaptionCancelled()
+            data = proc.stdout.read(8000)  # 4000 frames of 16-bit audio
+            if len(data) == 0:
+                break
+            bytes_read += len(data)
+            if rec.AcceptWaveform(data):
+                collect(rec.Result())
+                last_partial = ""
+
+            seconds_read = bytes_read / (2 * CAPTION_SAMPLE_RATE)
+            if updates is not None and seconds_read >= next_update:
+                next_update = seconds_read + CAPTION_UPDATE_SECONDS
+                partial = json.loads(rec.PartialResult()).get('partial', '')
+                if partial != last_partial:
+                    last_partial = partial
+                    updates.put(('partial', index, partial))
+                updates.put(('progress', index, seconds_read))
+        collect(rec.FinalResult())
+
+        error_output = proc.stderr.read().decode('utf-8', errors='replace').strip()
+        if proc.wait() != 0:
+            raise RuntimeError(f"FFmpeg failed: {error_output}")
+
+        # Only recognizers that finished cleanly go back into the pool
+        release_recognizer(model_path, rec)
+        if updates is not None:
+            updates.put(('done', index, bytes_read / (2 * CAPTION_SAMPLE_RATE)))
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+    return words
+
+
+def transcribe_media(ffmpeg_path, model_path, file_path, progress=None, updates=None, cancel_event=None, info=None):
+    """Return the word-level transcript of a media file, using the caption cache when possible.
+
+    `progress` is called with the finished fraction (0-1) as chunks complete. It runs
+    on a pool thread, not the Tk thread. `updates` and `cancel_event` are passed on to
+    every chunk (see transcribe_caption_chunk), and CaptionCancelled is raised once
+    `cancel_event` is set. The media duration is stored in info['duration'].
+    """
+    cache_path = get_caption_cache_path(file_path, model_path)
+    words = load_caption_cache(cache_path)
+    if words is not None:
+        return words
+
+    info = {} if info is None else info
+    done_lock = threading.Lock()
+    done_seconds = [0.0]
+
+    def chunk_done(start, end):
+        with done_lock:
+            done_seconds[0] += (end if end is not None else info.get('duration', start)) - start
+            if info.get('duration'):
+                progress(min(1.0, done_seconds[0] / info['duration']))
+
+    # Split the audio at silences and transcribe the chunks in parallel.
+    # Chunks are submitted while the silence scan is still running, and each
+    # worker streams its own slice of audio from ffmpeg.
+    pool = get_caption_pool(model_path)
+    futures = []
+    chunks = iter_caption_chunks(ffmpeg_path, file_path, info)
+    try:
+        for index, (start, end) in enumerate(chunks):
+            if cancel_event is not None and cancel_event.is_set():
+                raise CaptionCancelled()
+            future = pool.submit(transcribe_caption_chunk, ffmpeg_path, model_path, file_path,
+                                 start, end, index, updates, cancel_event)
+            if progress:
+                future.add_done_callback(lambda f, start=start, end=end: chunk_done(start, end))
+            futures.append(future)
+
+        # Stitch the words back together in chunk order
+        words = []
+        for future in futures:
+            words.extend(future.result())
+    except BrokenProcessPool:
+        # A worker died - start fresh workers for the next job
+        discard_caption_pool(model_path)
+        raise
+    finally:
+        chunks.close()  # Stops the silence scan if it is still running
+        for future in futures:
+            future.cancel()
+
+    save_caption_cache(cache_path, file_path, model_path, words)
+    return words
+
+
+class CancelToken(threading.Event):
+    """Cooperative cancellation flag - queued tasks holding it are skipped, running ones check it.
+
+    A child token is also cancelled when its parent is.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__()
+        self.parent = parent
+
+    def is_set(self):
+        return super().is_set() or (self.parent is not None and self.parent.is_set())
+
+    def cancel(self):
+        self.set()
+
+    @property
+    def cancelled(self):
+        return self.is_set()
+
+    def child(self):
+        return CancelToken(self)
+
+
+class TaskScheduler:
+    """Runs the app's background work and hands the results back to the Tk thread.
+
+    Short tasks go to one of two fixed pools - 'io' for disk and subprocess waits,
+    'cpu' for decoding - and each pool takes its tasks in priority order. Jobs that
+    mostly wait (captioning, folder scans) get a thread of their own with spawn().
+    All results reach the UI through one queue that is drained on the Tk loop.
+    """
+
+    def __init__(self, root, io_workers=TASK_IO_WORKERS, cpu_workers=TASK_CPU_WORKERS):
+        self.root = root
+        self.queues = {'io': queue.PriorityQueue(), 'cpu': queue.PriorityQueue()}
+        self.worker_counts = {'io': io_workers, 'cpu': cpu_workers}
+        self.sequence = itertools.count()  # Keeps tasks of the same priority in order
+        self.ui_queue = queue.SimpleQueue()
+        self.ui_lock = threading.Lock()
+        self.ui_pending = False
+        self.selection = CancelToken()  # Cancelled whenever another file is selected
+        for pool, count in self.worker_counts.items():
+            for i in range(count):
+                threading.Thread(target=self.run_worker, args=(self.queues[pool],),
+                                 name=f"{pool}-worker-{i}", daemon=True).start()
+
+    def submit(self, fn, *args, pool='io', priority=TASK_PRIORITY_NORMAL, token=None, on_done=None, on_error=None):
+        """Queue fn(*args) and return its Future.
+
+        on_done(result) or on_error(exception) runs on the Tk thread afterwards,
+        unless `token` was cancelled in the meantime.
+        """
+        future = Future()
+        self.queues[pool].put((priority, next(self.sequence), (future, fn, args, token, on_done, on_error)))
+        return future
+
+    def spawn(self, fn, *args):
+        """Run a long job on its own thread so it doesn't hold a pool worker while it waits"""
+        thread = threading.Thread(target=fn, args=args, daemon=True)
+        thread.start()
+        return thread
+
+    def run_worker(self, tasks):
+        while True:
+            task = tasks.get()[2]
+            if task is None:
+                return
+            future, fn, args, token, on_done, on_error = task
+            if token is not None and token.cancelled:
+                future.cancel()
+                continue
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = fn(*args)
+            except Exception as e:
+                if token is None or not token.cancelled:
+                    if on_error is not None:
+                        self.post(on_error, e)
+                    else:
+                        print(f"Error in background task: {e}")
+                future.set_exception(e)
+                continue
+            # Posted before the future resolves, so code waiting on it runs after the callback
+            if on_done is not None and (token is None or not token.cancelled):
+                self.post(on_done, result)
+            future.set_result(result)
+
+    def post(self, callback, *args):
+        """Run callback(*args) on the Tk thread - safe to call from any thread"""
+        self.ui_queue.put((callback, args))
+        with self.ui_lock:
+            if self.ui_pending:
+                return
+            self.ui_pending = True
+        try:
+            self.root.after(0, self.drain)
+        except (RuntimeError, tk.TclError):
+            pass  # The window is already closed
+
+    def drain(self):
+        with self.ui_lock:
+            self.ui_pending = False
+        while True:
+            try:
+                callback, args = self.ui_queue.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"Error in UI callback: {e}")
+
+    def new_selection(self):
+        """Cancel the work of the previous selection and return the token for the new one"""
+        self.selection.cancel()
+        self.selection = CancelToken()
+        return self.selection
+
+    def shutdown(self):
+        self.selection.cancel()
+        for pool, count in self.worker_counts.items():
+            for _ in range(count):
+                self.queues[pool].put((-1, next(self.sequence), None))
+
+
+class MemoryAccountant:
+    """One memory budget shared by every cache of decoded content and every Tk image on screen.
+
+    Owners charge each object they hold with its size and, if it can be dropped, an
+    evict(key) callback. Once the total is over budget the least recently used
+    evictable objects go first, whichever cache they belong to. Objects charged
+    without a callback (what is on screen) count against the budget but stay until
+    their owner releases them. Only used from the Tk thread.
+    """
+
+    def __init__(self, budget):
+        self.budget = budget
+        self.entries = OrderedDict()  # (owner, key) -> (size, evict)
+        self.used = 0
+        self.on_change = None  # Called after every change, e.g. to update a status bar
+
+    def charge(self, owner, key, size, evict=None):
+        self.forget((owner, key))
+        self.entries[(owner, key)] = (size, evict)
+        self.used += size
+        self.enforce()
+        self.changed()
+
+    def touch(self, owner, key):
+        if (owner, key) in self.entries:
+            self.entries.move_to_end((owner, key))
+
+    def release(self, owner, key):
+        if self.forget((owner, key)):
+            self.changed()
+
+    def release_owner(self, owner):
+        keys = [entry for entry in self.entries if entry[0] == owner]
+        for entry in keys:
+            self.forget(entry)
+        if keys:
+            self.changed()
+
+    def set_budget(self, budget):
+        self.budget = budget
+        self.enforce()
+        self.changed()
+
+    def usage(self):
+        """Bytes charged by each owner"""
+        totals = {}
+        for (owner, key), (size, evict) in self.entries.items():
+            totals[owner] = totals.get(owner, 0) + size
+        return totals
+
+    def forget(self, entry):
+        item = self.entries.pop(entry, None)
+        if item is None:
+            return False
+        self.used -= item[0]
+        return True
+
+    def enforce(self):
+        for entry in list(self.entries):
+            if self.used <= self.budget:
+                break
+            size, evict = self.entries[entry]
+            if evict is None:
+                continue
+            self.forget(entry)
+            evict(entry[1])
+
+    def changed(self):
+        if self.on_change is not None:
+            self.on_change()
+
+
+class PrefetchCache:
+    """Decoded file contents, charged to the memory accountant so they are dropped when memory runs short.
+
+    Entries are keyed by (path, kind) and remember the file's size and mtime, so a
+    file changed on disk is read again. Only used from the Tk thread.
+    """
+
+    def __init__(self, accountant):
+        self.accountant = accountant
+        self.entries = {}  # (path, kind) -> (stamp, value)
+
+    @staticmethod
+    def get_stamp(file_path):
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def get(self, file_path, kind):
+        key = (os.path.normcase(os.path.abspath(file_path)), kind)
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] != self.get_stamp(file_path):
+            self.discard(key)
+            return None
+        self.accountant.touch('prefetch', key)
+        return entry[1]
+
+    def take(self, file_path, kind):
+        """Remove an entry and return its value, so its new holder can charge it instead"""
+        key = (os.path.normcase(os.path.abspath(file_path)), kind)
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        self.discard(key)
+        return entry[1]
+
+    def put(self, file_path, kind, value, size):
+        if size > self.accountant.budget:
+            return
+        stamp = self.get_stamp(file_path)
+        if stamp is None:
+            return
+        key = (os.path.normcase(os.path.abspath(file_path)), kind)
+        self.entries[key] = (stamp, value)
+        self.accountant.charge('prefetch', key, size, self.evict)
+
+    def evict(self, key):
+        self.entries.pop(key, None)
+
+    def discard(self, key):
+        if self.entries.pop(key, None) is not None:
+            self.accountant.release('prefetch', key)
+
+
+class VlcEventBridge:
+    """Forwards a VLC player's events to the Tk thread.
+
+    VLC calls event callbacks on its own threads, so the callbacks only record the
+    newest time/length/state and schedule a single Tk callback. A burst of events
+    becomes one UI update, and nothing runs at all while the player is idle.
+    """
+    EVENTS = (
+        'MediaPlayerTimeChanged',
+        'MediaPlayerLengthChanged',
+        'MediaPlayerPlaying',
+        'MediaPlayerPaused',
+        'MediaPlayerStopped',
+        'MediaPlayerEndReached',
+        'MediaPlayerEncounteredError',
+        'MediaPlayerMediaChanged',
+    )
+
+    def __init__(self, scheduler, player, handler):
+        self.scheduler = scheduler
+        self.handler = handler
+        self.lock = threading.Lock()
+        self.state = {}
+        self.pending = False
+        self.attached = True
+        self.event_manager = player.event_manager()
+        for name in self.EVENTS:
+            self.event_manager.event_attach(getattr(vlc.EventType, name), self.on_event, name)
+
+    def on_event(self, event, name):
+        with self.lock:
+            if name == 'MediaPlayerTimeChanged':
+                self.state['time'] = event.u.new_time
+            elif name == 'MediaPlayerLengthChanged':
+                self.state['length'] = event.u.new_length
+            elif name == 'MediaPlayerMediaChanged':
+                # Times recorded so far belong to the media that was playing before
+                if 'time' in self.state:
+                    self.state['previous_time'] = self.state.pop('time')
+                self.state.pop('length', None)
+                self.state['media_changed'] = True
+            else:
+                self.state['status'] = name
+            if self.pending:
+                return
+            self.pending = True
+        self.scheduler.post(self.drain)
+
+    def clear(self):
+        """Forget events that belong to the previous media"""
+        with self.lock:
+            self.state = {}
+
+    def drain(self):
+        with self.lock:
+            state, self.state = self.state, {}
+            self.pending = False
+        if self.attached and state:
+            self.handler(state)
+
+    def detach(self):
+        self.attached = False
+        for name in self.EVENTS:
+            self.event_manager.event_detach(getattr(vlc.EventType, name))
+
+
 class FileOrganizerApp:
     def __init__(self, root):
         self.root = root
@@ -85,10 +1848,18 @@ class FileOrganizerApp:
         self.default_font = (self.font_family, 10)
         self.heading_font = (self.font_family, 12, "bold")
 
+        # Background work shared by the viewers, caption jobs and scans
+        self.scheduler = TaskScheduler(self.root)
+        # Caches and on-screen images share one memory budget, set from the saved settings
+        self.memory = MemoryAccountant(MEMORY_BUDGET_MB * 1024 * 1024)
+        self.prefetch_cache = PrefetchCache(self.memory)  # Content of files next to the selection, decoded ahead of time
+        self.img = None  # Decoded image in the viewer, charged to 'image' rather than the prefetch cache
+        self.img_path = None
+
         # Data storage
         self.passwords = {}  # Store encrypted passwords for files/folders
         self.temp_passwords = {}  # Store temp lock passwords
-        self.unlocked_items = set()  # Track unlocked items
+        self.unlocked_items = set()  # Items unlocked this session - never saved, so locks return on restart
         self.controls_rules = []  # Rules from Controls.txt
         self.current_directory = None
         self.vlc_process = None
@@ -99,12 +1870,54 @@ class FileOrganizerApp:
         self.vlc_instance = None
         self.vlc_canvas = None  # Add this for audio playback
         self.media_playing = False
+        self.player_events = None  # VlcEventBridge of the player
+        self.preloaded_media = OrderedDict()  # path -> vlc.Media being parsed ahead of time
+        self.media_time = 0
+        self.media_length = 0
+        self.current_media_file = None
+        self.pending_seek = None  # (path, seconds) to seek to once VLC has started that media
+        self.caption_track = None  # Word timings and cues of the current media file
+        self.caption_overlay = None  # Label showing the cue at the playback position
+        self.caption_overlay_cue = -1
+        self.caption_batch = None  # State of the running folder caption batch
+        self.caption_jobs = {}  # media path -> state of its running caption job
+        self.playlist = None  # State of the folder playlist while one is shown
+        self.playback_positions = {}  # normalized media path -> resume position in milliseconds
+        self.media_probes = {}  # normalized media path -> size, mtime and probed metadata
+        self.media_probe_token = None  # Cancels the running media probe scan
+        self.media_probe_root = None  # Normalized root the media probe scan last ran for
+        self.media_probes_pending = set()  # Normalized media paths with a probe in flight
+        self.tree_nodes = {}  # normalized media path -> tree item
+        self.virtual_dirs = {}  # tree item of a large folder -> its entries and how many are in the tree
+        self.tree_entries = {}  # tree item -> (is_dir, name, path, size, mtime) from the folder scan
+        self.tree_sort = None  # (column, reverse) the tree is sorted by, None for the default name order
+        self.tree_headings = {}  # column -> heading text without the sort arrow
+        self.folder_sizes = {}  # normalized folder path -> (mtime, size of everything under it, time measured)
+        self.folder_nodes = {}  # normalized folder path -> tree item showing it
+        self.folder_size_pending = set()  # Normalized folders being walked - their subfolders come with them
+        self.folder_size_token = None  # Cancels the folder size scans of the previous root
+        self.folder_size_root = None  # Normalized root the running folder size scans belong to
+        self.file_hashes = None  # normalized path -> size, mtime and content hashes, loaded on first use
+        self.file_hashes_lock = threading.Lock()  # Held for a whole duplicate scan - one scan uses the cache at a time
+        self.duplicate_window = None  # The open Find Duplicates window - only one scan runs at a time
+        self.virtual_page_pending = False
+        self.waveform_canvas = None
+        self.waveform_levels = None  # {buckets: (mins, maxs)} of the current audio file
+        self.thumbnail_times = []  # Keyframe times (seconds) of the current video's filmstrip
+        self.thumbnail_sprite = None  # PIL image with the thumbnails side by side
+        self.thumbnail_photos = {}  # index -> PhotoImage shown in the seek preview
+        self.filmstrip_canvas = None
+        self.filmstrip_photo = None
+        self.thumbnail_preview = None
 
         # Load saved data
         self.load_passwords()
         self.load_temp_passwords()
+        self.load_item_states()
         self.load_controls()
-        self.load_custom_folder()
+        self.load_settings()
+        self.load_playback_positions()
+        self.load_media_probes()
 
         self.setup_ui()
         self.load_initial_directory()
@@ -125,8 +1938,20 @@ class FileOrganizerApp:
         vlc_setup_success = self.setup_vlc_environment()
         if not vlc_setup_success:
             print("⚠️ VLC setup failed - media playback may not work")
+
+        # Index cached transcripts in the background once the window is up.
+        # Caption workers are only started when captions are first requested.
+        self.root.after(TRANSCRIPT_INDEX_DELAY, self.start_transcript_index)
+        self.root.after(500, self.offer_caption_batch_resume)
         
     def setup_ui(self):
+        # Status bar showing how much of the memory budget is in use
+        self.memory_status = tk.Label(self.root, anchor=tk.W, font=self.default_font, bg='white',
+                                      relief=tk.SUNKEN, bd=1)
+        self.memory_status.pack(side=tk.BOTTOM, fill=tk.X)
+        self.memory.on_change = self.update_memory_status
+        self.update_memory_status()
+
         # Create main paned window for resizable sections
         self.main_paned = ttk.PanedWindow(self.root, orient=tk.HORIZONTAL)
         self.main_paned.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
@@ -157,6 +1982,14 @@ class FileOrganizerApp:
         file_menu.add_command(label="Refresh", command=self.refresh_tree)
         file_menu.add_separator()
         file_menu.add_command(label="Exit", command=self.root.quit)
+
+        tools_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="Tools", menu=tools_menu)
+        tools_menu.add_command(label="Search Transcripts", command=self.open_transcript_search)
+        tools_menu.add_command(label="Find Duplicates", command=self.open_duplicate_finder)
+        tools_menu.add_command(label="Disk Usage", command=self.open_disk_usage)
+        tools_menu.add_command(label="Hidden Items...", command=self.open_hidden_items)
+        tools_menu.add_command(label="Memory Budget...", command=self.set_memory_budget)
         
     def setup_left_panel(self):
         # Top frame for controls
@@ -176,13 +2009,24 @@ class FileOrganizerApp:
         tree_frame = ttk.Frame(self.left_frame)
         tree_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
 
-        self.tree = ttk.Treeview(tree_frame)
+        # values[0] is the item's path, then the details from the folder scan;
+        # the media columns are filled in by the background prober
+        self.tree = ttk.Treeview(tree_frame, columns=('path',) + TREE_DETAIL_COLUMNS + MEDIA_PROBE_COLUMNS,
+                                 displaycolumns=TREE_DETAIL_COLUMNS + MEDIA_PROBE_COLUMNS)
+        # Click a heading to sort by it, again to reverse
+        for column, heading, width in (('#0', "Name", None), ('size', "Size", 80), ('modified', "Modified", 120),
+                                       ('type', "Type", 60), ('duration', "Duration", 70), ('codec', "Codec", 80),
+                                       ('resolution', "Resolution", 80), ('bitrate', "Bitrate", 80)):
+            self.tree_headings[column] = heading
+            self.tree.heading(column, text=heading, command=lambda c=column: self.sort_tree(c))
+            if width:
+                self.tree.column(column, width=width, stretch=False)
         self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 
         # Scrollbar for tree
-        tree_scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.tree.yview)
-        tree_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.tree.configure(yscrollcommand=tree_scrollbar.set)
+        self.tree_scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.configure(yscrollcommand=self.on_tree_scroll)
 
         # Bind events
         self.tree.bind('<<TreeviewSelect>>', self.on_tree_select)
@@ -238,61 +2082,348 @@ class FileOrganizerApp:
         # Clear existing items
         for item in self.tree.get_children():
             self.tree.delete(item)
+        self.tree_nodes = {}
+        self.virtual_dirs = {}
+        self.tree_entries = {}
+        self.folder_nodes = {}
+        # Refreshing the same root keeps its folder walks going - their rows are found again by path
+        if self.normalize_path(root_path) != self.folder_size_root:
+            if self.folder_size_token is not None:
+                self.folder_size_token.cancel()
+            self.folder_size_token = CancelToken()
+            self.folder_size_pending = set()
+            self.folder_size_root = self.normalize_path(root_path)
             
         if not os.path.exists(root_path):
             return
+        # Refreshing the same root doesn't rescan it - expanded folders are probed as they open
+        if self.normalize_path(root_path) != self.media_probe_root:
+            self.start_media_probe(root_path)
             
         # Add root directory
+        root_mtime = os.stat(root_path).st_mtime
         root_node = self.tree.insert('', 'end', text=self.get_display_name(root_path),
-                                    values=[root_path], open=True)
+                                    values=[root_path, "", format_modified(root_mtime), "Folder"], open=True)
+        self.request_folder_size(root_node, root_path, root_mtime)
         
         self.add_directory_contents(root_node, root_path)
         
     def add_directory_contents(self, parent_node, directory_path):
         try:
-            items = os.listdir(directory_path)
-            
-            # Separate directories and files
-            directories = []
-            files = []
-            
-            for item in items:
-                if item.startswith('.'):  # Skip hidden files
-                    continue
-                    
-                item_path = os.path.join(directory_path, item)
-                
-                if os.path.isdir(item_path):
-                    directories.append((item, item_path))
-                else:
-                    files.append((item, item_path))
+            entries = self.sort_entries(scan_directory(directory_path))
+            self.probe_directory_media(directory_path)
             
-            # Add directories first
-            for dir_name, dir_path in sorted(directories):
-                if self.is_item_visible(dir_path):
-                    dir_node = self.tree.insert(parent_node, 'end', text=self.get_display_name(dir_path),
-                                              values=[dir_path])
-                    
-                    # Check if directory has contents to show expand option
-                    try:
-                        if any(os.path.isdir(os.path.join(dir_path, f)) or 
-                              os.path.isfile(os.path.join(dir_path, f)) 
-                              for f in os.listdir(dir_path) if not f.startswith('.')):
-                            self.tree.insert(dir_node, 'end', text='Loading...')
-                    except PermissionError:
-                        pass
+            if len(entries) > VIRTUAL_DIR_THRESHOLD:
+                # Keep the entries in a list and only give the tree the rows scrolled into view
+                self.virtual_dirs[parent_node] = {'entries': entries, 'next': 0, 'more': None}
+                self.add_directory_page(parent_node)
+                return
             
-            # Add files
-            for file_name, file_path in sorted(files):
-                if self.is_item_visible(file_path):
-                    self.tree.insert(parent_node, 'end', text=self.get_display_name(file_path),
-                                   values=[file_path])
+            # Directories come first
+            for entry in entries:
+                self.add_tree_entry(parent_node, *entry)
                                    
         except PermissionError:
             messagebox.showerror("Error", f"Permission denied accessing {directory_path}")
         except Exception as e:
             messagebox.showerror("Error", f"Error loading directory: {str(e)}")
     
+    def add_tree_entry(self, parent_node, is_dir, name, path, size, mtime):
+        """Insert one folder entry under parent_node. Returns False if it is hidden"""
+        if not self.is_item_visible(path):
+            return False
+        details = [format_modified(mtime), format_file_type(name, is_dir)]
+        if is_dir:
+            dir_node = self.tree.insert(parent_node, 'end', text=self.get_display_name(path),
+                                      values=[path, "", *details])
+            self.tree_entries[dir_node] = (is_dir, name, path, size, mtime)
+            self.request_folder_size(dir_node, path, mtime)
+            
+            # Check if directory has contents to show expand option
+            try:
+                if has_directory_contents(path):
+                    self.tree.insert(dir_node, 'end', text='Loading...')
+            except OSError:
+                pass
+        else:
+            file_node = self.tree.insert(parent_node, 'end', text=self.get_display_name(path),
+                           values=[path, format_size(size), *details, *self.get_media_values(path)])
+            self.tree_entries[file_node] = (is_dir, name, path, size, mtime)
+            if os.path.splitext(name)[1].lower() in VIDEO_EXTENSIONS + AUDIO_EXTENSIONS:
+                self.tree_nodes[self.normalize_path(path)] = file_node
+        return True
+
+    def add_directory_page(self, parent_node):
+        """Move the next VIRTUAL_PAGE_SIZE visible entries of a large folder into the tree"""
+        state = self.virtual_dirs.get(parent_node)
+        if state is None or not self.tree.exists(parent_node):
+            self.virtual_dirs.pop(parent_node, None)
+            return
+        if state['more'] is not None and self.tree.exists(state['more']):
+            self.tree.delete(state['more'])
+        entries = state['entries']
+        index = state['next']
+        added = 0
+        while index < len(entries) and added < VIRTUAL_PAGE_SIZE:
+            if self.add_tree_entry(parent_node, *entries[index]):
+                added += 1
+            index += 1
+        state['next'] = index
+        if index < len(entries):
+            # Placeholder row - scrolling it into view loads the next page
+            state['more'] = self.tree.insert(parent_node, 'end', text=f"Loading more... ({len(entries) - index} left)")
+        else:
+            del self.virtual_dirs[parent_node]
+
+    def on_tree_scroll(self, first, last):
+        self.tree_scrollbar.set(first, last)
+        if self.virtual_dirs and not self.virtual_page_pending:
+            # Not while Tk is still laying out the tree
+            self.virtual_page_pending = True
+            self.root.after_idle(self.load_visible_pages)
+
+    def load_visible_pages(self):
+        self.virtual_page_pending = False
+        for parent_node, state in list(self.virtual_dirs.items()):
+            more = state['more']
+            # bbox is empty while the row is scrolled away or its folder is collapsed
+            if more is not None and self.tree.exists(more) and self.tree.bbox(more):
+                self.add_directory_page(parent_node)
+
+    def get_directory_paths(self, item):
+        """Paths of a tree folder's visible entries, including those of a large folder not paged in yet"""
+        paths = [self.tree.item(child, 'values')[0] for child in self.tree.get_children(item)
+                 if self.tree.item(child, 'values')]
+        state = self.virtual_dirs.get(item)
+        if state is not None:
+            paths += [entry[2] for entry in state['entries'][state['next']:] if self.is_item_visible(entry[2])]
+        return paths
+
+    def get_media_values(self, file_path):
+        """Values for the media columns from the probe cache - blank for locked files"""
+        info = self.media_probes.get(self.normalize_path(file_path))
+        if info is None or 'duration' not in info or not self.is_item_unlocked(file_path):
+            return [""] * len(MEDIA_PROBE_COLUMNS)
+        return list(format_media_probe(info))
+
+    def get_folder_size(self, key, mtime):
+        """The cached size of a folder, or None if it was never measured, has changed or has expired"""
+        cached = self.folder_sizes.get(key)
+        if cached is None or cached[0] != mtime or time.time() - cached[2] > FOLDER_SIZE_TTL:
+            return None
+        return cached[1]
+
+    def request_folder_size(self, item, folder_path, mtime):
+        """Show a folder's total size, measuring it in the background unless it is cached"""
+        key = self.normalize_path(folder_path)
+        self.folder_nodes[key] = item
+        size = self.get_folder_size(key, mtime)
+        if size is not None:
+            self.tree.set(item, 'size', format_size(size))
+            return
+        # A walk of this folder or one above it fills in this row once it gets through this folder
+        parent = key
+        while True:
+            if parent in self.folder_size_pending:
+                return
+            parent, child = os.path.dirname(parent), parent
+            if parent == child:
+                break
+        self.folder_size_pending.add(key)
+
+        def failed(e):
+            self.folder_size_pending.discard(key)
+            print(f"Error measuring folder: {e}")
+
+        self.scheduler.submit(self.measure_folder, folder_path, mtime, self.folder_size_token,
+                              priority=TASK_PRIORITY_BACKGROUND, token=self.folder_size_token,
+                              on_done=lambda sizes: self.on_folder_sizes(sizes, key), on_error=failed)
+
+    def measure_folder(self, folder_path, mtime, token):
+        """Runs on a worker - returns {normalized path: (mtime, size, time measured)} for the folder and those below it.
+
+        Each subfolder is stamped when its own subtree is done, and finished subfolders are
+        handed to the tree every half second, so a large share fills in while it is walked.
+        """
+        if self.get_folder_size(self.normalize_path(folder_path), mtime) is not None:
+            return {}  # Measured as part of a parent folder since it was requested
+        measured = {}
+        batch = {}
+        state = {'reported': time.monotonic()}
+
+        def on_folder(path, path_mtime, size):
+            measured[self.normalize_path(path)] = batch[self.normalize_path(path)] = (path_mtime, size, time.time())
+            if time.monotonic() - state['reported'] > 0.5:
+                state['reported'] = time.monotonic()
+                self.scheduler.post(self.on_folder_sizes, dict(batch))
+                batch.clear()
+
+        if compute_folder_sizes(folder_path, mtime, token, on_folder) is None:
+            return None
+        return measured
+
+    def on_folder_sizes(self, sizes, measured_key=None):
+        self.folder_size_pending.discard(measured_key)
+        if not sizes:
+            return
+        self.folder_sizes.update(sizes)
+        for key, item in self.folder_nodes.items():
+            if key in sizes and self.tree.exists(item):
+                self.tree.set(item, 'size', format_size(sizes[key][1]))
+
+    def get_sort_key(self, column):
+        """Key function over (is_dir, name, path, size, mtime) entries for a tree column"""
+        if column == 'size':
+            def key(entry):
+                if not entry[0]:
+                    return entry[3]
+                cached = self.folder_sizes.get(self.normalize_path(entry[2]))
+                return cached[1] if cached else -1  # Not measured yet
+            return key
+        if column == 'modified':
+            return lambda entry: entry[4]
+        if column == 'type':
+            return lambda entry: (format_file_type(entry[1], entry[0]), entry[1].lower())
+        if column in MEDIA_PROBE_COLUMNS:
+            def key(entry):
+                info = self.media_probes.get(self.normalize_path(entry[2]), {})
+                if column == 'duration':
+                    return info.get('duration', -1)
+                if column == 'codec':
+                    return "/".join(info.get(k, "") for k in ('video_codec', 'audio_codec'))
+                if column == 'resolution':
+                    return info.get('width', 0) * info.get('height', 0)
+                return info.get('bitrate', -1)
+            return key
+        return lambda entry: entry[1].lower()
+
+    def sort_entries(self, entries):
+        """Order scanned entries by the tree's sort column, folders always first"""
+        if self.tree_sort is not None:
+            column, reverse = self.tree_sort
+            entries.sort(key=self.get_sort_key(column), reverse=reverse)
+            entries.sort(key=lambda entry: not entry[0])  # Stable, so the column order holds within each group
+        return entries
+
+    def sort_tree(self, column):
+        reverse = self.tree_sort == (column, False)
+        self.tree_sort = (column, reverse)
+        for name, heading in self.tree_headings.items():
+            arrow = (" ▼" if reverse else " ▲") if name == column else ""
+            self.tree.heading(name, text=heading + arrow)
+        for item in self.tree.get_children(''):
+            self.sort_tree_children(item)
+
+    def sort_tree_children(self, parent):
+        """Reorder the loaded contents of a tree folder, and of the folders loaded below it"""
+        state = self.virtual_dirs.get(parent)
+        if state is not None:
+            # A large folder is sorted in its backing list and paged in again from the top
+            self.sort_entries(state['entries'])
+            for child in self.tree.get_children(parent):
+                self.tree_entries.pop(child, None)
+            self.tree.delete(*self.tree.get_children(parent))
+            state['next'] = 0
+            state['more'] = None
+            self.add_directory_page(parent)
+            return
+        children = [child for child in self.tree.get_children(parent) if child in self.tree_entries]
+        entries = self.sort_entries([self.tree_entries[child] + (child,) for child in children])
+        for index, entry in enumerate(entries):
+            self.tree.move(entry[-1], parent, index)
+        for entry in entries:
+            if entry[0]:
+                self.sort_tree_children(entry[-1])
+
+    def start_media_probe(self, root_path):
+        # A newer scan makes the running one stop
+        if self.media_probe_token is not None:
+            self.media_probe_token.cancel()
+        self.media_probe_token = CancelToken()
+        self.media_probe_root = self.normalize_path(root_path)
+        self.media_probes_pending = set()
+        self.scheduler.spawn(self.run_media_probe, root_path, self.media_probe_token)
+
+    def probe_directory_media(self, directory_path):
+        """Probe the media files directly inside a folder that was just expanded"""
+        if self.media_probe_token is not None:
+            self.scheduler.spawn(self.run_media_probe, directory_path, self.media_probe_token, False)
+
+    def run_media_probe(self, root_path, token, recursive=True):
+        """Probe every visible media file under root_path whose cache entry is missing or stale"""
+        ffmpeg_path = get_ffmpeg_path()
+        if not os.path.exists(ffmpeg_path):
+            return
+        seen = set()
+        futures = []
+        pending = self.media_probes_pending
+        try:
+            for dirpath, dirnames, filenames in os.walk(root_path):
+                if token.cancelled:
+                    break
+                dirnames[:] = [d for d in dirnames if recursive and not d.startswith('.')
+                               and self.is_item_visible(os.path.join(dirpath, d))]
+                for name in filenames:
+                    if name.startswith('.') or os.path.splitext(name)[1].lower() not in VIDEO_EXTENSIONS + AUDIO_EXTENSIONS:
+                        continue
+                    file_path = os.path.join(dirpath, name)
+                    if not self.is_item_visible(file_path):
+                        continue
+                    try:
+                        stat = os.stat(file_path)
+                    except OSError:
+                        continue
+                    key = self.normalize_path(file_path)
+                    seen.add(key)
+                    cached = self.media_probes.get(key)
+                    if cached and cached.get('size') == stat.st_size and cached.get('mtime') == stat.st_mtime:
+                        continue
+                    if key in pending:
+                        continue
+                    pending.add(key)
+                    # Unreadable files are cached too, so they aren't probed again until they change
+                    futures.append(self.scheduler.submit(
+                        probe_media, ffmpeg_path, file_path, priority=TASK_PRIORITY_BACKGROUND, token=token,
+                        on_done=lambda info, p=file_path, k=key, st=stat: self.on_media_probed(p, k, st, info),
+                        on_error=lambda e, p=file_path, k=key, st=stat: self.on_media_probed(p, k, st, {})))
+        except Exception as e:
+            print(f"Error scanning media files: {e}")
+        wait(futures)
+        if not token.cancelled:
+            self.scheduler.post(self.finish_media_probe, root_path, seen, recursive)
+
+    def on_media_probed(self, file_path, key, stat, info):
+        info.update(size=stat.st_size, mtime=stat.st_mtime)
+        self.media_probes[key] = info
+        self.media_probes_pending.discard(key)
+        item = self.tree_nodes.get(key)
+        if item and self.tree.exists(item):
+            for column, value in zip(MEDIA_PROBE_COLUMNS, self.get_media_values(file_path)):
+                self.tree.set(item, column, value)
+
+    def finish_media_probe(self, root_path, seen, recursive=True):
+        # Forget files under the root that no longer exist
+        if recursive:
+            root_key = os.path.join(self.normalize_path(root_path), '')
+            for key in [key for key in self.media_probes if key.startswith(root_key) and key not in seen]:
+                del self.media_probes[key]
+        self.save_media_probes()
+
+    def load_media_probes(self):
+        try:
+            if os.path.exists(MEDIA_PROBE_CACHE):
+                with open(MEDIA_PROBE_CACHE, 'r', encoding='utf-8') as file:
+                    self.media_probes = json.load(file)
+        except Exception as e:
+            print(f"Error loading media probe cache: {e}")
+            self.media_probes = {}
+
+    def save_media_probes(self):
+        try:
+            write_json_atomic(MEDIA_PROBE_CACHE, self.media_probes)
+        except Exception as e:
+            print(f"Error saving media probe cache: {e}")
+
     def on_tree_select(self, event):
         selection = self.tree.selection()
         if not selection:
@@ -320,28 +2451,26 @@ class FileOrganizerApp:
         else:
             # Handle file selection
             self.display_file(file_path)
+            self.prefetch_neighbours(item)
     
     def display_file(self, file_path):
+        self.stop_playlist()
+        self.scheduler.new_selection()
+        self.release_viewer_memory()
 
-        if hasattr(self, 'vlc_player') and self.vlc_player:
+        # The player is kept for the next media file - just stop it
+        if self.vlc_player:
             self.vlc_player.stop()
-            self.vlc_player.release()
-            self.vlc_player = None
         
         # Check if file is locked
         if not self.is_item_unlocked(file_path):
             self.show_not_accessible_message(file_path)
             return
             
-        # Stop any existing media playback and clean up
-        if hasattr(self, 'vlc_player') and self.vlc_player:
-            self.vlc_player.stop()
-            self.vlc_player.release()
-            del self.vlc_player
-
         # Clear current display
         for widget in self.display_frame.winfo_children():
             widget.destroy()
+        self.current_media_file = None
             
         # Hide media controls initially
         self.media_controls.pack_forget()
@@ -357,9 +2486,9 @@ class FileOrganizerApp:
                 self.display_csv_file(file_path)
             elif file_ext == '.json':
                 self.display_json_file(file_path)
-            elif file_ext in ['.mp4', '.avi', '.mkv', '.mov']:
+            elif file_ext in VIDEO_EXTENSIONS:
                 self.display_video_file(file_path)
-            elif file_ext in ['.mp3', '.wav', '.flac', '.m4a']:
+            elif file_ext in AUDIO_EXTENSIONS:
                 self.display_audio_file(file_path)
             elif file_ext in ['.png', '.jpg', '.jpeg']:
                 self.display_image_file(file_path)
@@ -368,10 +2497,7 @@ class FileOrganizerApp:
                 
         except Exception as e:
             # Clean up on error
-            if hasattr(self, 'vlc_player') and self.vlc_player:
-                self.vlc_player.stop()
-                self.vlc_player.release()
-                del self.vlc_player
+            self.release_vlc_player()
                 
             error_frame = ttk.Frame(self.display_frame)
             error_frame.pack(expand=True)
@@ -382,6 +2508,16 @@ class FileOrganizerApp:
             ttk.Button(error_frame, text="Try Again", 
                     command=lambda: self.display_file(file_path)).pack(pady=10)
 
+    def release_vlc_player(self):
+        self.stop_playlist()
+        if self.player_events:
+            self.player_events.detach()
+            self.player_events = None
+        if self.vlc_player:
+            self.vlc_player.stop()
+            self.vlc_player.release()
+            self.vlc_player = None
+
     def display_image_file(self, file_path):
         # Clear any existing image frame
         for widget in self.display_frame.winfo_children():
@@ -406,19 +2542,22 @@ class FileOrganizerApp:
         container.grid_rowconfigure(0, weight=1)
         container.grid_columnconfigure(0, weight=1)
         
-        try:
-            # Load the image
-            self.img = Image.open(file_path)
+        def show(img):
+            # The viewer holds the image now - move its charge over from the prefetch cache
+            self.prefetch_cache.take(file_path, 'image')
+            self.img = img
+            self.img_path = file_path
+            self.memory.charge('image', 'decoded', estimate_content_size(img))
             self.update_image_display(canvas)
-            
+
             # Bind resize event
             canvas.bind('<Configure>', lambda e: self.update_image_display(canvas))
-            
-        except Exception as e:
-            error_label = tk.Label(container, 
-                                text=f"Error loading image: {str(e)}",  # Fixed quote
-                                font=self.default_font)
-            error_label.grid(row=0, column=0)
+
+        # Load the image off the Tk thread
+        self.img = None
+        max_size = (self.root.winfo_screenwidth(), self.root.winfo_screenheight())
+        self.load_in_background(container, load_image_file, (file_path, max_size), show, "Error loading image",
+                                pool='cpu', cache_kind='image')
 
     def update_image_display(self, canvas):
         """Update the image display when window is resized"""
@@ -444,6 +2583,7 @@ class FileOrganizerApp:
                 # Resize image
                 resized_img = self.img.resize((new_width, new_height), Image.LANCZOS)
                 self.tk_img = ImageTk.PhotoImage(resized_img)
+                self.memory.charge('image', 'photo', photo_size(new_width, new_height))
                 
                 # Update canvas
                 canvas.delete("all")
@@ -491,6 +2631,108 @@ class FileOrganizerApp:
             canvas.config(scrollregion=canvas.bbox('all'))
 
     
+    def load_in_background(self, parent, read, args, show, error_text, pool='io', cache_kind=None, placeholder=True):
+        """Show a placeholder in parent, run read(*args, token) off the Tk thread and pass its result to show().
+
+        Selecting another file cancels the load, so only the last selected file is ever rendered.
+        With cache_kind, a prefetched result for args[0] is shown straight away, and a freshly
+        read one is kept so stepping back to the file is immediate too.
+        """
+        if cache_kind is not None:
+            cached = self.prefetch_cache.get(args[0], cache_kind)
+            if cached is not None:
+                show(cached)
+                return
+        label = tk.Label(parent, text="Loading...", font=self.default_font, bg='white')
+        if placeholder:
+            label.place(relx=0.5, rely=0.5, anchor=tk.CENTER)
+        token = self.scheduler.selection
+
+        def done(measured):
+            result, size = measured
+            if result is not None and cache_kind is not None:
+                self.prefetch_cache.put(args[0], cache_kind, result, size)
+            if not parent.winfo_exists():
+                return
+            label.destroy()
+            if result is not None:
+                show(result)
+
+        def failed(e):
+            if parent.winfo_exists():
+                label.config(text=f"{error_text}: {str(e)}")
+                label.place(relx=0.5, rely=0.5, anchor=tk.CENTER)
+
+        self.scheduler.submit(read_measured, read, *args, token, pool=pool, priority=TASK_PRIORITY_VISIBLE,
+                              token=token, on_done=done, on_error=failed)
+
+    def prefetch_neighbours(self, item):
+        """Decode the files just above and below the selected tree item before they are opened"""
+        for sibling in (self.tree.next(item), self.tree.prev(item)):
+            if not sibling:
+                continue
+            values = self.tree.item(sibling, 'values')
+            if not values:
+                continue
+            file_path = values[0]
+            if os.path.isdir(file_path) or not self.is_item_unlocked(file_path):
+                continue
+            try:
+                self.prefetch_file(file_path)
+            except Exception as e:
+                print(f"Error prefetching file: {e}")
+
+    def prefetch_file(self, file_path):
+        """Queue the read the viewer for file_path starts with, behind anything visible.
+
+        The work is tied to the current selection, so moving on cancels whatever hasn't run.
+        """
+        token = self.scheduler.selection
+        file_ext = os.path.splitext(file_path)[1].lower()
+        pool = 'io'
+        if file_ext == '.txt':
+            if os.path.getsize(file_path) <= TEXT_READ_CHUNK:
+                kind, read, args = 'text', read_text_file, (file_path,)
+            else:  # Enough to fill the window while the rest loads
+                kind, read, args = 'text_head', read_text_head, (file_path,)
+        elif file_ext == '.csv':
+            if os.path.getsize(file_path) > PREFETCH_CSV_BYTES:
+                return
+            kind, read, args = 'csv', read_csv_file, (file_path,)
+        elif file_ext in ['.png', '.jpg', '.jpeg']:
+            max_size = (self.root.winfo_screenwidth(), self.root.winfo_screenheight())
+            kind, read, args, pool = 'image', load_image_file, (file_path, max_size), 'cpu'
+        elif file_ext == '.pdf' and PDF_SUPPORT:
+            kind, read, args, pool = 'pdf', render_pdf_preview, (file_path,), 'cpu'
+        elif file_ext in VIDEO_EXTENSIONS + AUDIO_EXTENSIONS:
+            # Media metadata goes to the tree's probe cache instead
+            ffmpeg_path = get_ffmpeg_path()
+            if not os.path.exists(ffmpeg_path):
+                return
+            stat = os.stat(file_path)
+            key = self.normalize_path(file_path)
+            cached = self.media_probes.get(key)
+            if cached and cached.get('size') == stat.st_size and cached.get('mtime') == stat.st_mtime:
+                return
+            self.scheduler.submit(
+                probe_media, ffmpeg_path, file_path, priority=TASK_PRIORITY_PREFETCH, token=token,
+                on_done=lambda info: self.on_media_probed(file_path, key, stat, info),
+                on_error=lambda e: self.on_media_probed(file_path, key, stat, {}))
+            return
+        else:
+            return
+        if self.prefetch_cache.get(file_path, kind) is not None:
+            return
+
+        def done(measured):
+            result, size = measured
+            if result is not None:
+                self.prefetch_cache.put(file_path, kind, result, size)
+
+        # A failed guess costs nothing - the viewer reports the error if the file is opened
+        self.scheduler.submit(read_measured, read, *args, token, pool=pool, priority=TASK_PRIORITY_PREFETCH,
+                              token=token, on_done=done, on_error=lambda e: None)
+
     def display_text_file(self, file_path):
         text_frame = ttk.Frame(self.display_frame)
         text_frame.pack(fill=tk.BOTH, expand=True)
@@ -503,17 +2745,27 @@ class FileOrganizerApp:
         text_widget.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
-        # Load and display text
-        try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                content = file.read()
-                text_widget.insert(tk.END, content)
-        except UnicodeDecodeError:
-            with open(file_path, 'r', encoding='latin-1') as file:
-                content = file.read()
-                text_widget.insert(tk.END, content)
-        
         text_widget.config(state=tk.DISABLED)
+
+        # The start of a large file may have been prefetched - show it while the rest loads
+        head = "" if self.prefetch_cache.get(file_path, 'text') else self.prefetch_cache.get(file_path, 'text_head') or ""
+        if head:
+            text_widget.config(state=tk.NORMAL)
+            text_widget.insert(tk.END, head)
+            text_widget.config(state=tk.DISABLED)
+
+        def show(content):
+            text_widget.config(state=tk.NORMAL)
+            if head and content.startswith(head):
+                text_widget.insert(tk.END, content[len(head):])
+            else:
+                text_widget.delete('1.0', tk.END)
+                text_widget.insert(tk.END, content)
+            text_widget.config(state=tk.DISABLED)
+
+        # Load and display text
+        self.load_in_background(text_frame, read_text_file, (file_path,), show, "Error loading text",
+                                cache_kind='text', placeholder=not head)
     
     def display_pdf_file(self, file_path):
         if PDF_SUPPORT:
@@ -526,6 +2778,12 @@ class FileOrganizerApp:
         self.pdf_file_path = file_path
         self.pdf_scroll_mode = 'vertical'  # 'vertical' or 'horizontal'
         self.pdf_current_page = 0
+        self.pdf_page_count = None  # Known once the first render finishes
+        self.pdf_render_token = None
+        self.pdf_pages = {}  # page number -> canvas item, y offset, height and bytes of a vertical page
+        self.pdf_pinned = set()  # Pages in view, charged without an evict callback
+        self.pdf_restoring = set()  # Evicted pages being rendered again
+        self.pdf_scroll_pending = False
 
         pdf_frame = ttk.Frame(self.display_frame)
         pdf_frame.pack(fill=tk.BOTH, expand=True)
@@ -559,7 +2817,8 @@ class FileOrganizerApp:
         self.pdf_canvas = tk.Canvas(display_area, bg='white')
         v_scrollbar = ttk.Scrollbar(display_area, orient=tk.VERTICAL, command=self.pdf_canvas.yview)
         h_scrollbar = ttk.Scrollbar(display_area, orient=tk.HORIZONTAL, command=self.pdf_canvas.xview)
-        self.pdf_canvas.configure(yscrollcommand=v_scrollbar.set, xscrollcommand=h_scrollbar.set)
+        self.pdf_canvas.configure(yscrollcommand=lambda first, last: self.on_pdf_scroll(v_scrollbar, first, last),
+                                  xscrollcommand=h_scrollbar.set)
         self.pdf_canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         v_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         h_scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
@@ -577,8 +2836,9 @@ class FileOrganizerApp:
     def go_to_pdf_page(self):
         try:
             page_num = int(self.page_entry.get()) - 1
-            doc = fitz.open(self.pdf_file_path)
-            if 0 <= page_num < len(doc):
+            if self.pdf_page_count is None:
+                return
+            if 0 <= page_num < self.pdf_page_count:
                 self.pdf_current_page = page_num
                 self.render_pdf_pages()
             else:
@@ -596,6 +2856,11 @@ class FileOrganizerApp:
         self.render_pdf_pages()
 
     def render_pdf_pages(self):
+        # A newer render (zoom, resize, page change) replaces the one in progress
+        if self.pdf_render_token is not None:
+            self.pdf_render_token.cancel()
+        token = self.pdf_render_token = self.scheduler.selection.child()
+
         self.pdf_canvas.delete("all")
         # Remove previous navigation button frames
         for widget in self.display_frame.winfo_children():
@@ -603,82 +2868,151 @@ class FileOrganizerApp:
                 children = widget.winfo_children()
                 if any(isinstance(child, ttk.Button) and child.cget("text") in ["Previous Page", "Next Page"] for child in children):
                     widget.destroy()
-        
-        try:
-            doc = fitz.open(self.pdf_file_path)
-            self.pdf_images = []
-            
+
+        self.pdf_images = {}
+        self.pdf_pages = {}
+        self.pdf_pinned = set()
+        self.pdf_restoring = set()
+        self.memory.release_owner('pdf')
+        canvas_width = self.pdf_canvas.winfo_width()
+        canvas_height = self.pdf_canvas.winfo_height()
+        page_offsets = []
+        layout = {'y_offset': 0}
+        self.pdf_canvas.create_text(max(canvas_width, 2) // 2, 20, text="Loading...", font=self.default_font,
+                                    tags='placeholder')
+
+        def show_page(page_num, img_data):
+            if token.cancelled or not self.pdf_canvas.winfo_exists():
+                return
+            self.pdf_canvas.delete('placeholder')
+            img = tk.PhotoImage(data=img_data)
+            self.pdf_images[page_num] = img
+
             if self.pdf_scroll_mode == 'vertical':
-                y_offset = 0
-                page_offsets = []
-                
-                for page_num in range(len(doc)):
-                    page = doc.load_page(page_num)
-                    
-                    # Use the user's zoom factor directly without fitting to canvas
-                    zoom = self.pdf_zoom
-                    mat = fitz.Matrix(zoom, zoom)
-                    pix = page.get_pixmap(matrix=mat)
-                    img_data = pix.tobytes("ppm")
-                    img = tk.PhotoImage(data=img_data)
-                    self.pdf_images.append(img)
-                    
-                    # Center the page horizontally
-                    canvas_width = self.pdf_canvas.winfo_width()
-                    x_pos = max(0, (canvas_width - img.width()) // 2)
-                    self.pdf_canvas.create_image(x_pos, y_offset, anchor=tk.NW, image=img)
-                    page_offsets.append(y_offset)
-                    y_offset += img.height() + 10  # Add some spacing between pages
-                
-                # Set scroll region to encompass all pages
-                total_height = y_offset - 10  # Remove last spacing
-                canvas_width = self.pdf_canvas.winfo_width()
-                self.pdf_canvas.configure(scrollregion=(0, 0, canvas_width, total_height))
-                self.page_label.config(text=f"Page: {self.pdf_current_page + 1}")
-                
-                # Scroll to selected page if in vertical mode
-                if 0 <= self.pdf_current_page < len(page_offsets):
-                    self.pdf_canvas.yview_moveto(page_offsets[self.pdf_current_page] / max(total_height, 1))
-            
-            else:  # Horizontal scroll mode - keep original fitting behavior
-                canvas_height = self.pdf_canvas.winfo_height()
-                page = doc.load_page(self.pdf_current_page)
-                
-                # Calculate zoom to fit page height to canvas height at 100% zoom
-                zoom = (canvas_height - 20) / page.rect.height  # -20 for padding
-                zoom *= self.pdf_zoom  # Apply user zoom factor
-                
-                mat = fitz.Matrix(zoom, zoom)
-                pix = page.get_pixmap(matrix=mat)
-                img_data = pix.tobytes("ppm")
-                img = tk.PhotoImage(data=img_data)
-                self.pdf_images = [img]
-                
-                # Center the page vertically
+                # Center the page horizontally
+                x_pos = max(0, (canvas_width - img.width()) // 2)
+                item = self.pdf_canvas.create_image(x_pos, layout['y_offset'], anchor=tk.NW, image=img)
+                self.pdf_pages[page_num] = {'item': item, 'y': layout['y_offset'], 'height': img.height(),
+                                            'size': photo_size(img.width(), img.height())}
+                # Pages scrolled out of view can be dropped and are rendered again when they come back
+                self.charge_pdf_page(page_num, page_num in self.get_visible_pdf_pages())
+                page_offsets.append(layout['y_offset'])
+                layout['y_offset'] += img.height() + 10  # Add some spacing between pages
+                # Pages appear as they are rendered
+                self.pdf_canvas.configure(scrollregion=(0, 0, canvas_width, layout['y_offset'] - 10))
+            else:
+                # Center the page vertically - the only page, always in view
+                self.memory.charge('pdf', page_num, photo_size(img.width(), img.height()))
                 y_pos = (canvas_height - img.height()) // 2
                 self.pdf_canvas.create_image(0, y_pos, anchor=tk.NW, image=img)
                 self.pdf_canvas.configure(scrollregion=(0, 0, img.width(), canvas_height))
-                self.page_label.config(text=f"Page: {self.pdf_current_page + 1}")
 
+        def finish(page_count):
+            if page_count is None or token.cancelled or not self.pdf_canvas.winfo_exists():
+                return
+            self.pdf_page_count = page_count
+            self.page_label.config(text=f"Page: {self.pdf_current_page + 1}")
+
+            if self.pdf_scroll_mode == 'vertical':
+                # Scroll to selected page if in vertical mode
+                total_height = layout['y_offset'] - 10  # Remove last spacing
+                if 0 <= self.pdf_current_page < len(page_offsets):
+                    self.pdf_canvas.yview_moveto(page_offsets[self.pdf_current_page] / max(total_height, 1))
+            else:
                 # Add navigation buttons for horizontal mode
                 nav_btn_frame = ttk.Frame(self.display_frame)
                 nav_btn_frame.pack(fill=tk.X, pady=5)
                 ttk.Button(nav_btn_frame, text="Previous Page", command=self.prev_pdf_page).pack(side=tk.LEFT, padx=5)
                 ttk.Button(nav_btn_frame, text="Next Page", command=self.next_pdf_page).pack(side=tk.LEFT, padx=5)
-        
-        except Exception as e:
-            tk.Label(self.display_frame, text=f"Error loading PDF: {str(e)}", font=self.default_font).pack(expand=True)
+
+        def failed(e):
+            if not token.cancelled and self.display_frame.winfo_exists():
+                self.pdf_canvas.delete('placeholder')
+                tk.Label(self.display_frame, text=f"Error loading PDF: {str(e)}", font=self.default_font).pack(expand=True)
+
+        if self.pdf_scroll_mode == 'vertical':
+            # Use the user's zoom factor directly without fitting to canvas
+            pages, fit_height = None, None
+            # The document as first opened may have its leading pages prefetched
+            preview = self.prefetch_cache.get(self.pdf_file_path, 'pdf') if self.pdf_zoom == 1.0 else None
+            if preview is not None:
+                for page_num, data in enumerate(preview['pages']):
+                    show_page(page_num, data)
+                pages = range(len(preview['pages']), preview['page_count'])
+        else:  # Horizontal scroll mode - fit the page height to the canvas at 100% zoom
+            pages, fit_height = [self.pdf_current_page], canvas_height
+
+        # Pages are rendered off the Tk thread and handed over one at a time
+        self.scheduler.submit(render_pdf_document, self.pdf_file_path, self.pdf_zoom, pages, fit_height, token,
+                              lambda page_num, data: self.scheduler.post(show_page, page_num, data),
+                              pool='cpu', priority=TASK_PRIORITY_VISIBLE, token=token,
+                              on_done=finish, on_error=failed)
+
+    def get_visible_pdf_pages(self):
+        top = self.pdf_canvas.canvasy(0)
+        bottom = self.pdf_canvas.canvasy(self.pdf_canvas.winfo_height())
+        return {page_num for page_num, page in self.pdf_pages.items()
+                if page['y'] < bottom and page['y'] + page['height'] > top}
+
+    def charge_pdf_page(self, page_num, visible):
+        if visible:
+            self.pdf_pinned.add(page_num)
+        else:
+            self.pdf_pinned.discard(page_num)
+        self.memory.charge('pdf', page_num, self.pdf_pages[page_num]['size'],
+                           None if visible else self.evict_pdf_page)
+
+    def evict_pdf_page(self, page_num):
+        """Drop an off-screen page's image - it is rendered again when scrolled back into view"""
+        self.pdf_images.pop(page_num, None)
+        page = self.pdf_pages.get(page_num)
+        if page is not None and self.pdf_canvas.winfo_exists():
+            self.pdf_canvas.itemconfigure(page['item'], image='')
+
+    def on_pdf_scroll(self, scrollbar, first, last):
+        scrollbar.set(first, last)
+        if self.pdf_pages and not self.pdf_scroll_pending:
+            self.pdf_scroll_pending = True
+            self.root.after_idle(self.update_pdf_pages)
+
+    def update_pdf_pages(self):
+        """Pin the pages in view, unpin the rest and render visible pages again that were evicted"""
+        self.pdf_scroll_pending = False
+        if not self.pdf_canvas.winfo_exists():
+            return
+        visible = self.get_visible_pdf_pages()
+        for page_num in self.pdf_pages:
+            if page_num in self.pdf_images and (page_num in visible) != (page_num in self.pdf_pinned):
+                self.charge_pdf_page(page_num, page_num in visible)
+
+        missing = sorted(page_num for page_num in visible
+                         if page_num not in self.pdf_images and page_num not in self.pdf_restoring)
+        if not missing:
+            return
+        self.pdf_restoring.update(missing)
+        token = self.pdf_render_token
+        self.scheduler.submit(render_pdf_document, self.pdf_file_path, self.pdf_zoom, missing, None, token,
+                              lambda page_num, data: self.scheduler.post(self.restore_pdf_page, token, page_num, data),
+                              pool='cpu', priority=TASK_PRIORITY_VISIBLE, token=token,
+                              on_error=lambda e: self.pdf_restoring.difference_update(missing))
+
+    def restore_pdf_page(self, token, page_num, img_data):
+        self.pdf_restoring.discard(page_num)
+        if token.cancelled or not self.pdf_canvas.winfo_exists() or page_num not in self.pdf_pages:
+            return
+        img = tk.PhotoImage(data=img_data)
+        self.pdf_images[page_num] = img
+        self.pdf_canvas.itemconfigure(self.pdf_pages[page_num]['item'], image=img)
+        self.charge_pdf_page(page_num, page_num in self.get_visible_pdf_pages())
 
     def prev_pdf_page(self):
-        doc = fitz.open(self.pdf_file_path)
         if self.pdf_current_page > 0:
             self.pdf_current_page -= 1
             self.page_label.config(text=f"Page: {self.pdf_current_page + 1}")
             self.render_pdf_pages()
 
     def next_pdf_page(self):
-        doc = fitz.open(self.pdf_file_path)
-        if self.pdf_current_page < len(doc) - 1:
+        if self.pdf_page_count is not None and self.pdf_current_page < self.pdf_page_count - 1:
             self.pdf_current_page += 1
             self.page_label.config(text=f"Page: {self.pdf_current_page + 1}")
             self.render_pdf_pages()
@@ -699,27 +3033,25 @@ class FileOrganizerApp:
         csv_scrollbar_y.pack(side=tk.RIGHT, fill=tk.Y)
         csv_scrollbar_x.pack(side=tk.BOTTOM, fill=tk.X)
         
+        def show(table):
+            headers, rows = table
+            if not headers:
+                return
+            # Use first line as headers
+            csv_tree['columns'] = headers
+            csv_tree['show'] = 'headings'
+
+            for col in headers:
+                csv_tree.heading(col, text=col)
+                csv_tree.column(col, width=100)
+
+            # Add data rows
+            for values in rows:
+                csv_tree.insert('', 'end', values=values)
+
         # Load CSV data
-        try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                lines = file.readlines()
-                if lines:
-                    # Use first line as headers
-                    headers = [col.strip() for col in lines[0].split(',')]
-                    csv_tree['columns'] = headers
-                    csv_tree['show'] = 'headings'
-                    
-                    for col in headers:
-                        csv_tree.heading(col, text=col)
-                        csv_tree.column(col, width=100)
-                    
-                    # Add data rows
-                    for line in lines[1:]:
-                        values = [val.strip() for val in line.split(',')]
-                        csv_tree.insert('', 'end', values=values)
-        except Exception as e:
-            tk.Label(csv_frame, text=f"Error loading CSV: {str(e)}", 
-                    font=self.default_font).pack(expand=True)
+        self.load_in_background(csv_frame, read_csv_file, (file_path,), show, "Error loading CSV",
+                                cache_kind='csv')
     
     def display_video_file(self, file_path):
         video_frame = ttk.Frame(self.display_frame)
@@ -735,6 +3067,20 @@ class FileOrganizerApp:
         self.vlc_canvas = tk.Canvas(video_frame, width=400, height=300, bg='black')
         self.vlc_canvas.pack(fill=tk.BOTH, expand=True)
 
+        # Caption overlay along the bottom of the video, placed only while a cue is showing
+        self.caption_overlay = tk.Label(video_frame, text="", font=(self.font_family, 14),
+                                        fg='white', bg='black', wraplength=600)
+        self.caption_overlay_placement = dict(in_=self.vlc_canvas, relx=0.5, rely=1.0, anchor=tk.S, y=-10)
+
+        # Keyframe filmstrip - click a frame to jump to it
+        self.filmstrip_canvas = tk.Canvas(video_frame, height=THUMBNAIL_HEIGHT, bg='black', highlightthickness=0)
+        self.filmstrip_canvas.pack(fill=tk.X)
+        filmstrip_scrollbar = ttk.Scrollbar(video_frame, orient=tk.HORIZONTAL, command=self.filmstrip_canvas.xview)
+        filmstrip_scrollbar.pack(fill=tk.X)
+        self.filmstrip_canvas.configure(xscrollcommand=filmstrip_scrollbar.set)
+        self.filmstrip_canvas.bind('<Button-1>', self.on_filmstrip_click)
+        self.thumbnail_preview = tk.Label(video_frame, bd=1, relief=tk.SOLID)
+
         # Control frame with improved layout
         control_frame = ttk.Frame(video_frame)
         control_frame.pack(fill=tk.X, pady=5)
@@ -754,6 +3100,8 @@ class FileOrganizerApp:
         self.seek_slider = ttk.Scale(seek_frame, variable=self.seek_var, from_=0, to=100, 
                                     orient=tk.HORIZONTAL, command=self.on_seek)
         self.seek_slider.pack(fill=tk.X, expand=True)
+        self.seek_slider.bind('<Motion>', self.show_seek_preview)
+        self.seek_slider.bind('<Leave>', lambda e: self.thumbnail_preview.place_forget())
         
         self.time_label = ttk.Label(seek_frame, text="00:00:00 / 00:00:00")
         self.time_label.pack()
@@ -795,6 +3143,15 @@ class FileOrganizerApp:
         self.interval_var = tk.StringVar(value="30")
         interval_menu = ttk.OptionMenu(interval_frame, self.interval_var, "30", "10", "30", "60")
         interval_menu.pack(side=tk.LEFT)
+        self.interval_var.trace_add('write', self.update_caption_intervals)
+
+        self.caption_cancel_btn = ttk.Button(caption_btn_frame, text="Cancel", width=7, state=tk.DISABLED,
+                command=lambda: self.cancel_captions(file_path))
+        self.caption_cancel_btn.pack(side=tk.LEFT, padx=2)
+        self.caption_progress = ttk.Progressbar(caption_btn_frame, orient=tk.HORIZONTAL, length=120, maximum=1.0)
+        self.caption_progress.pack(side=tk.LEFT, padx=5)
+        self.caption_status_label = ttk.Label(caption_btn_frame, text="")
+        self.caption_status_label.pack(side=tk.LEFT, padx=5)
 
         # Text container with scrollbar
         text_container = ttk.Frame(video_frame)
@@ -809,29 +3166,13 @@ class FileOrganizerApp:
         
         self.current_media_file = file_path
         self.generated_captions = ""
-
-        # Add this to the end of display_video_file and display_audio_file methods
-        # Replace the existing VLC initialization section with:
+        self.caption_track = None
+        self.caption_overlay_cue = -1
+        self.load_cached_captions(file_path)
+        self.load_thumbnails(file_path)
 
         try:
-            # Initialize VLC instance if not already created
-            if not hasattr(self, 'vlc_instance') or self.vlc_instance is None:
-                self.vlc_instance = vlc.Instance()
-            
-            self.vlc_player = self.vlc_instance.media_player_new()
-            media = self.vlc_instance.media_new(file_path)
-            self.vlc_player.set_media(media)
-            
-            # Set the display window - use the hidden canvas for audio
-            if sys.platform == "win32":
-                self.vlc_player.set_hwnd(self.vlc_canvas.winfo_id())
-            elif sys.platform == "darwin":
-                self.vlc_player.set_nsobject(self.vlc_canvas.winfo_id())
-            else:
-                self.vlc_player.set_xwindow(self.vlc_canvas.winfo_id())
-            
-            self.media_playing = False
-            self.update_seek_bar()
+            self.load_player_media(file_path)
             
         except Exception as e:
             # Show error message and fallback option
@@ -871,6 +3212,16 @@ class FileOrganizerApp:
         tk.Label(title_frame, text="Audio File", font=self.heading_font).pack(side=tk.LEFT)
         tk.Label(title_frame, text=os.path.basename(file_path), font=self.default_font).pack(side=tk.LEFT, padx=10)
 
+        # Waveform overview above the seek bar - click it to seek
+        self.waveform_canvas = None
+        self.waveform_levels = None
+        if NUMPY_SUPPORT:
+            self.waveform_canvas = tk.Canvas(audio_frame, height=WAVEFORM_HEIGHT, bg='white', highlightthickness=0)
+            self.waveform_canvas.pack(fill=tk.X, padx=5, pady=(5, 0))
+            self.waveform_canvas.bind('<Configure>', lambda e: self.draw_waveform())
+            self.waveform_canvas.bind('<Button-1>', self.on_waveform_click)
+            self.load_waveform(file_path)
+
         # Control frame with improved layout
         control_frame = ttk.Frame(audio_frame)
         control_frame.pack(fill=tk.X, pady=10)
@@ -912,6 +3263,11 @@ class FileOrganizerApp:
                                 orient=tk.HORIZONTAL, command=self.change_volume, length=80)
         volume_slider.grid(row=0, column=3)
 
+        # Caption line for the playback position
+        self.caption_overlay = tk.Label(audio_frame, text="", font=(self.font_family, 14), wraplength=600)
+        self.caption_overlay.pack(fill=tk.X, pady=5)
+        self.caption_overlay_placement = None
+
         # Captions section with improved layout
         caption_frame = ttk.Frame(audio_frame)
         caption_frame.pack(fill=tk.X, pady=5)
@@ -931,6 +3287,15 @@ class FileOrganizerApp:
         self.interval_var = tk.StringVar(value="30")
         interval_menu = ttk.OptionMenu(interval_frame, self.interval_var, "30", "10", "30", "60")
         interval_menu.pack(side=tk.LEFT)
+        self.interval_var.trace_add('write', self.update_caption_intervals)
+
+        self.caption_cancel_btn = ttk.Button(caption_btn_frame, text="Cancel", width=7, state=tk.DISABLED,
+                command=lambda: self.cancel_captions(file_path))
+        self.caption_cancel_btn.pack(side=tk.LEFT, padx=2)
+        self.caption_progress = ttk.Progressbar(caption_btn_frame, orient=tk.HORIZONTAL, length=120, maximum=1.0)
+        self.caption_progress.pack(side=tk.LEFT, padx=5)
+        self.caption_status_label = ttk.Label(caption_btn_frame, text="")
+        self.caption_status_label.pack(side=tk.LEFT, padx=5)
 
         # Text container with scrollbar
         text_container = ttk.Frame(audio_frame)
@@ -945,32 +3310,12 @@ class FileOrganizerApp:
         
         self.current_media_file = file_path
         self.generated_captions = ""
-
-        # Add this to the end of display_video_file and display_audio_file methods
-        # Replace the existing VLC initialization section with:
+        self.caption_track = None
+        self.caption_overlay_cue = -1
+        self.load_cached_captions(file_path)
 
         try:
-            # Initialize VLC instance if not already created
-            if not hasattr(self, 'vlc_instance') or self.vlc_instance is None:
-                self.vlc_instance = vlc.Instance()
-            
-            self.vlc_player = self.vlc_instance.media_player_new()
-            media = self.vlc_instance.media_new(file_path)
-            self.vlc_player.set_media(media)
-            
-            # Set the display window - use the hidden canvas for audio
-            if sys.platform == "win32":
-                self.vlc_player.set_hwnd(self.vlc_canvas.winfo_id())
-            elif sys.platform == "darwin":
-                self.vlc_player.set_nsobject(self.vlc_canvas.winfo_id())
-            else:
-                self.vlc_player.set_xwindow(self.vlc_canvas.winfo_id())
-            
-            self.media_playing = False
-            self.update_seek_bar()
-
-            self.media_playing = False
-            self.update_seek_bar()
+            self.load_player_media(file_path)
             
         except Exception as e:
             # Show error message and fallback option
@@ -996,6 +3341,9 @@ class FileOrganizerApp:
     def play_media(self):
         if self.vlc_player:
             if not self.media_playing:
+                # A finished media has to be stopped before it can play again
+                if self.vlc_player.get_state() == vlc.State.Ended:
+                    self.vlc_player.stop()
                 self.vlc_player.play()
                 self.media_playing = True
                 self.play_btn.config(text="Pause")
@@ -1010,83 +3358,573 @@ class FileOrganizerApp:
             self.media_playing = False
             self.play_btn.config(text="Play")
 
-    def stop_media(self):
-        if self.vlc_player:
-            self.vlc_player.stop()
-            self.media_playing = False
-            self.play_btn.config(text="Play")
-            self.seek_var.set(0)
-            self.time_label.config(text="00:00:00 / 00:00:00")
+    def stop_media(self):
+        if self.vlc_player:
+            self.vlc_player.stop()
+            self.media_playing = False
+            self.play_btn.config(text="Play")
+            self.seek_var.set(0)
+            self.time_label.config(text="00:00:00 / 00:00:00")
+
+    def on_seek(self, value):
+        if self.vlc_player and self.vlc_player.is_seekable():
+            media_length = self.vlc_player.get_length()
+            if media_length > 0:
+                seek_pos = float(value) / 100 * media_length
+                self.vlc_player.set_time(int(seek_pos))
+
+    def change_speed(self, speed):
+        if self.vlc_player:
+            self.vlc_player.set_rate(float(speed))
+
+    def change_volume(self, volume):
+        if self.vlc_player:
+            try:
+                # Ensure we're working with an integer
+                vol = int(float(volume))  # First convert to float, then to int
+                self.vlc_player.audio_set_volume(vol)
+            except Exception as e:
+                print(f"Error setting volume: {e}")
+
+    def get_vlc_player(self):
+        """The player is created once and reused - switching files only swaps its media"""
+        if self.vlc_player is None:
+            # Initialize VLC instance if not already created
+            if self.vlc_instance is None:
+                self.vlc_instance = vlc.Instance()
+            self.vlc_player = self.vlc_instance.media_player_new()
+            # Drive the seek bar, time label and play button from the player's events
+            self.player_events = VlcEventBridge(self.scheduler, self.vlc_player, self.on_player_events)
+        return self.vlc_player
+
+    def load_player_media(self, file_path):
+        player = self.get_vlc_player()
+        player.stop()
+
+        media = self.preloaded_media.pop(file_path, None)
+        if media is None:
+            media = self.vlc_instance.media_new(file_path)
+        player.set_media(media)
+        self.set_player_window(player)
+
+        self.player_events.clear()
+        self.media_playing = False
+        self.media_time = 0
+        # A preloaded media already knows its length
+        self.media_length = max(0, media.get_duration())
+        media.release()  # The player holds its own reference
+        self.update_seek_bar()
+
+        # Opened from a transcript search - play it so VLC reports when it can seek
+        if self.pending_seek is not None:
+            if self.pending_seek[0] == file_path:
+                self.play_media()
+            else:
+                self.pending_seek = None
+
+        self.root.after_idle(lambda: self.preload_next_media(file_path))
+
+    def set_player_window(self, player):
+        # Set the display window - use the hidden canvas for audio
+        if sys.platform == "win32":
+            player.set_hwnd(self.vlc_canvas.winfo_id())
+        elif sys.platform == "darwin":
+            player.set_nsobject(self.vlc_canvas.winfo_id())
+        else:
+            player.set_xwindow(self.vlc_canvas.winfo_id())
+
+    def preload_next_media(self, file_path):
+        """Parse the next media file below the selected one so it opens instantly"""
+        selection = self.tree.selection()
+        if not selection or tuple(self.tree.item(selection[0], 'values'))[:1] != (file_path,):
+            return
+        item = self.tree.next(selection[0])
+        while item:
+            values = self.tree.item(item, 'values')
+            if values and os.path.splitext(values[0])[1].lower() in VIDEO_EXTENSIONS + AUDIO_EXTENSIONS:
+                if self.is_item_unlocked(values[0]):
+                    self.preload_media(values[0])
+                return
+            item = self.tree.next(item)
+
+    def preload_media(self, file_path):
+        if file_path in self.preloaded_media or self.vlc_instance is None:
+            return
+        try:
+            media = self.vlc_instance.media_new(file_path)
+            media.parse_with_options(vlc.MediaParseFlag.network, MEDIA_PARSE_TIMEOUT)  # Runs in the background
+        except Exception as e:
+            print(f"Error preloading media: {e}")
+            return
+        self.preloaded_media[file_path] = media
+        while len(self.preloaded_media) > MEDIA_PRELOAD_LIMIT:
+            self.preloaded_media.popitem(last=False)[1].release()
+
+    def on_player_events(self, state):
+        if self.playlist is not None:
+            self.on_playlist_events(state)
+        self.media_time = state.get('time', self.media_time)
+        self.media_length = state.get('length', self.media_length)
+
+        status = state.get('status')
+        if status is not None:
+            self.media_playing = status == 'MediaPlayerPlaying'
+            try:
+                if self.play_btn.winfo_exists():
+                    self.play_btn.config(text="Pause" if self.media_playing else "Play")
+            except Exception as e:
+                print(f"Error in on_player_events: {e}")
+            if status == 'MediaPlayerEndReached':
+                self.media_time = self.media_length
+
+        # The length is only known once VLC has started the media
+        if (self.pending_seek is not None and self.media_length > 0
+                and (status == 'MediaPlayerPlaying' or 'length' in state)):
+            file_path, seconds = self.pending_seek
+            self.pending_seek = None
+            if self.current_media_file == file_path and self.vlc_player:
+                self.vlc_player.set_time(int(seconds * 1000))
+                self.media_time = int(seconds * 1000)
+
+        self.update_seek_bar()
+
+    def play_folder(self):
+        """Play the visible, unlocked media files of the selected folder one after another"""
+        selection = self.tree.selection()
+        if not selection:
+            return
+        item = selection[0]
+        folder = self.tree.item(item, 'values')[0]
+        if not os.path.isdir(folder):
+            return
+
+        # Load the folder's contents if it has not been expanded yet
+        children = self.tree.get_children(item)
+        if len(children) == 1 and self.tree.item(children[0], 'text') == 'Loading...':
+            self.tree.delete(children[0])
+            self.add_directory_contents(item, folder)
+
+        files = []
+        for path in self.get_directory_paths(item):
+            if os.path.splitext(path)[1].lower() not in VIDEO_EXTENSIONS + AUDIO_EXTENSIONS:
+                continue
+            if os.path.isfile(path) and self.is_item_unlocked(path):
+                files.append(path)
+        if not files:
+            messagebox.showinfo("Info", "There are no playable media files in this folder.")
+            return
+
+        try:
+            self.display_playlist(folder, files)
+        except Exception as e:
+            self.release_vlc_player()
+            messagebox.showerror("Error", f"Error playing folder: {str(e)}")
+
+    def display_playlist(self, folder, files):
+        self.stop_playlist()
+        self.scheduler.new_selection()
+        self.release_viewer_memory()
+        if self.vlc_player:
+            self.vlc_player.stop()
+        for widget in self.display_frame.winfo_children():
+            widget.destroy()
+        self.media_controls.pack_forget()
+        self.current_media_file = None
+        self.caption_track = None
+        self.caption_overlay = None
+
+        playlist_frame = ttk.Frame(self.display_frame)
+        playlist_frame.pack(fill=tk.BOTH, expand=True)
+
+        title_frame = ttk.Frame(playlist_frame)
+        title_frame.pack(fill=tk.X, pady=5)
+        tk.Label(title_frame, text="Playlist", font=self.heading_font).pack(side=tk.LEFT)
+        tk.Label(title_frame, text=os.path.basename(folder) or folder, font=self.default_font).pack(side=tk.LEFT, padx=10)
+        self.playlist_title = tk.Label(title_frame, text="", font=self.default_font)
+        self.playlist_title.pack(side=tk.LEFT, padx=10)
+
+        self.vlc_canvas = tk.Canvas(playlist_frame, width=400, height=300, bg='black')
+        self.vlc_canvas.pack(fill=tk.BOTH, expand=True)
+
+        control_frame = ttk.Frame(playlist_frame)
+        control_frame.pack(fill=tk.X, pady=5)
+
+        btn_frame = ttk.Frame(control_frame)
+        btn_frame.pack(side=tk.LEFT, padx=5, anchor=tk.W)
+        ttk.Button(btn_frame, text="Prev", width=5, command=self.previous_playlist_item).pack(side=tk.LEFT, padx=2)
+        self.play_btn = ttk.Button(btn_frame, text="Play", width=6, command=self.toggle_playlist)
+        self.play_btn.pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_frame, text="Next", width=5, command=self.next_playlist_item).pack(side=tk.LEFT, padx=2)
+
+        seek_frame = ttk.Frame(control_frame)
+        seek_frame.pack(fill=tk.X, expand=True, padx=5)
+
+        self.seek_var = tk.DoubleVar()
+        self.seek_slider = ttk.Scale(seek_frame, variable=self.seek_var, from_=0, to=100,
+                                    orient=tk.HORIZONTAL, command=self.on_seek)
+        self.seek_slider.pack(fill=tk.X, expand=True)
+
+        self.time_label = ttk.Label(seek_frame, text="00:00:00 / 00:00:00")
+        self.time_label.pack()
+
+        settings_frame = ttk.Frame(control_frame)
+        settings_frame.pack(side=tk.RIGHT, padx=5, anchor=tk.E)
+
+        self.playlist_shuffle_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(settings_frame, text="Shuffle", variable=self.playlist_shuffle_var,
+                        command=self.shuffle_playlist).grid(row=0, column=0, padx=2)
+        self.playlist_repeat_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(settings_frame, text="Repeat", variable=self.playlist_repeat_var,
+                        command=self.update_playlist_mode).grid(row=0, column=1, padx=2)
+
+        ttk.Label(settings_frame, text="Vol:").grid(row=0, column=2, sticky=tk.W)
+        self.volume_var = tk.IntVar(value=50)
+        volume_slider = ttk.Scale(settings_frame, variable=self.volume_var, from_=0, to=100,
+                                orient=tk.HORIZONTAL, command=self.change_volume, length=80)
+        volume_slider.grid(row=0, column=3)
+
+        # Files in playing order - double-click one to jump to it
+        list_container = ttk.Frame(playlist_frame)
+        list_container.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.playlist_listbox = tk.Listbox(list_container, height=6, font=self.default_font, exportselection=False)
+        scrollbar = ttk.Scrollbar(list_container, orient=tk.VERTICAL, command=self.playlist_listbox.yview)
+        self.playlist_listbox.configure(yscrollcommand=scrollbar.set)
+        self.playlist_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.playlist_listbox.bind('<Double-Button-1>', self.play_selected_playlist_item)
+
+        player = self.get_vlc_player()
+        self.set_player_window(player)
+        self.player_events.clear()
+        self.media_playing = False
+        self.media_time = 0
+        self.media_length = 0
+
+        # The list player drives the session's player, so its events keep the controls in sync
+        list_player = self.vlc_instance.media_list_player_new()
+        list_player.set_media_player(player)
+        self.playlist = {
+            'folder': folder,
+            'files': list(files),
+            'order': [],
+            'paths': {},  # media MRL -> file path
+            'list_player': list_player,
+            'media_list': None,
+            'current': None,
+            'resume': None,
+        }
+        self.build_playlist_media()
+        list_player.play()
+
+    def build_playlist_media(self, first=None):
+        """Load the playlist's files into a new media list, shuffled if requested, starting with first"""
+        playlist = self.playlist
+        order = list(playlist['files'])
+        if self.playlist_shuffle_var.get():
+            random.shuffle(order)
+        if first in order:
+            order.remove(first)
+            order.insert(0, first)
+
+        media_list = self.vlc_instance.media_list_new()
+        paths = {}
+        for file_path in order:
+            media = self.vlc_instance.media_new(file_path)
+            paths[media.get_mrl()] = file_path
+            media_list.add_media(media)
+            media.release()  # The list holds its own reference
+        playlist['list_player'].set_media_list(media_list)
+        if playlist['media_list'] is not None:
+            playlist['media_list'].release()
+        playlist.update(order=order, paths=paths, media_list=media_list)
+
+        self.playlist_listbox.delete(0, tk.END)
+        for file_path in order:
+            self.playlist_listbox.insert(tk.END, os.path.basename(file_path))
+        self.highlight_playlist_item()
+
+    def highlight_playlist_item(self):
+        playlist = self.playlist
+        self.playlist_listbox.selection_clear(0, tk.END)
+        if playlist['current'] in playlist['order']:
+            index = playlist['order'].index(playlist['current'])
+            self.playlist_listbox.selection_set(index)
+            self.playlist_listbox.see(index)
+            self.playlist_title.config(text=os.path.basename(playlist['current']))
+
+    def preload_playlist_item(self, index):
+        """Parse the upcoming item while the current one plays so the switch has no gap"""
+        playlist = self.playlist
+        if not 0 <= index < len(playlist['order']):
+            return
+        media = playlist['media_list'].item_at_index(index)
+        if media is None:
+            return
+        try:
+            media.parse_with_options(vlc.MediaParseFlag.network, MEDIA_PARSE_TIMEOUT)
+        except Exception as e:
+            print(f"Error preloading playlist item: {e}")
+        finally:
+            media.release()
+
+    def get_playlist_current(self):
+        media = self.vlc_player.get_media()
+        if media is None:
+            return None
+        try:
+            return self.playlist['paths'].get(media.get_mrl())
+        finally:
+            media.release()
+
+    def on_playlist_events(self, state):
+        playlist = self.playlist
+        if state.get('media_changed'):
+            if playlist['current']:
+                self.remember_playback_position(playlist['current'], state.get('previous_time', self.media_time))
+                self.save_playback_positions()
+            playlist['current'] = self.get_playlist_current()
+            playlist['resume'] = None
+            self.media_time = 0
+            self.media_length = 0
+            if playlist['current']:
+                playlist['resume'] = self.playback_positions.get(self.normalize_path(playlist['current']))
+                self.highlight_playlist_item()
+                index = playlist['order'].index(playlist['current']) + 1
+                if index == len(playlist['order']) and self.playlist_repeat_var.get():
+                    index = 0
+                self.preload_playlist_item(index)
+
+        status = state.get('status')
+        if status == 'MediaPlayerPlaying' and playlist['resume']:
+            self.vlc_player.set_time(playlist['resume'])
+            playlist['resume'] = None
+        elif status == 'MediaPlayerEndReached' and playlist['current']:
+            # Finished files start from the beginning next time
+            self.playback_positions.pop(self.normalize_path(playlist['current']), None)
+            self.save_playback_positions()
+        elif status in ('MediaPlayerPaused', 'MediaPlayerStopped') and playlist['current']:
+            self.remember_playback_position(playlist['current'], state.get('time', self.media_time))
+            self.save_playback_positions()
+
+    def toggle_playlist(self):
+        if self.playlist is None:
+            return
+        list_player = self.playlist['list_player']
+        if self.media_playing:
+            list_player.pause()
+        elif self.vlc_player.get_state() == vlc.State.Ended:
+            # The end of the list was reached - start over
+            list_player.play_item_at_index(0)
+        else:
+            list_player.play()
+
+    def next_playlist_item(self):
+        if self.playlist is not None:
+            self.playlist['list_player'].next()
+
+    def previous_playlist_item(self):
+        if self.playlist is not None:
+            self.playlist['list_player'].previous()
+
+    def play_selected_playlist_item(self, event=None):
+        selection = self.playlist_listbox.curselection()
+        if self.playlist is not None and selection:
+            self.playlist['list_player'].play_item_at_index(selection[0])
 
-    def on_seek(self, value):
-        if self.vlc_player and self.vlc_player.is_seekable():
-            media_length = self.vlc_player.get_length()
-            if media_length > 0:
-                seek_pos = float(value) / 100 * media_length
-                self.vlc_player.set_time(int(seek_pos))
+    def shuffle_playlist(self):
+        """Reorder the files that come after the current one"""
+        if self.playlist is None:
+            return
+        playing = self.media_playing
+        self.build_playlist_media(first=self.playlist['current'])
+        # Restarting the current file resumes it from its remembered position
+        if playing:
+            self.playlist['list_player'].play_item_at_index(0)
+        else:
+            self.vlc_player.stop()
 
-    def change_speed(self, speed):
-        if self.vlc_player:
-            self.vlc_player.set_rate(float(speed))
+    def update_playlist_mode(self):
+        if self.playlist is not None:
+            mode = vlc.PlaybackMode.loop if self.playlist_repeat_var.get() else vlc.PlaybackMode.default
+            self.playlist['list_player'].set_playback_mode(mode)
 
-    def change_volume(self, volume):
-        if self.vlc_player:
-            try:
-                # Ensure we're working with an integer
-                vol = int(float(volume))  # First convert to float, then to int
-                self.vlc_player.audio_set_volume(vol)
-            except Exception as e:
-                print(f"Error setting volume: {e}")
+    def stop_playlist(self):
+        playlist = self.playlist
+        if playlist is None:
+            return
+        self.playlist = None
+        if playlist['current']:
+            self.remember_playback_position(playlist['current'], self.media_time)
+            self.save_playback_positions()
+        try:
+            playlist['list_player'].stop()
+            playlist['list_player'].release()
+            if playlist['media_list'] is not None:
+                playlist['media_list'].release()
+        except Exception as e:
+            print(f"Error stopping playlist: {e}")
 
-    def update_seek_bar(self):
+    def remember_playback_position(self, file_path, media_time):
+        key = self.normalize_path(file_path)
+        length = self.media_length
+        if media_time > PLAYBACK_RESUME_MARGIN and (length <= 0 or media_time < length - PLAYBACK_RESUME_MARGIN):
+            self.playback_positions[key] = int(media_time)
+        else:
+            self.playback_positions.pop(key, None)
 
+    def load_playback_positions(self):
         try:
-            if not hasattr(self, 'vlc_player') or self.vlc_player is None:
-                return
+            if os.path.exists(PLAYBACK_POSITIONS_FILE):
+                with open(PLAYBACK_POSITIONS_FILE, 'r', encoding='utf-8') as file:
+                    self.playback_positions = json.load(file)
+        except Exception as e:
+            print(f"Error loading playback positions: {e}")
+            self.playback_positions = {}
 
+    def save_playback_positions(self):
+        try:
+            write_json_atomic(PLAYBACK_POSITIONS_FILE, self.playback_positions)
         except Exception as e:
-            print(f"Error in update_seek_bar: {e}")
+            print(f"Error saving playback positions: {e}")
+
+    def load_waveform(self, file_path):
+        """Read the waveform from the cache, or compute it from the audio, off the Tk thread"""
+        token = self.scheduler.selection
+        self.scheduler.submit(get_waveform_levels, get_ffmpeg_path(), file_path, token,
+                              pool='cpu', priority=TASK_PRIORITY_VISIBLE, token=token,
+                              on_done=lambda levels: self.show_waveform(file_path, levels),
+                              on_error=lambda e: print(f"Error computing waveform: {e}"))
+
+    def show_waveform(self, file_path, levels):
+        if levels is None or file_path != self.current_media_file:
+            return
+        self.waveform_levels = levels
+        self.draw_waveform()
+
+    def draw_waveform(self):
+        canvas = self.waveform_canvas
+        if canvas is None or self.waveform_levels is None or not canvas.winfo_exists():
+            return
+        width = canvas.winfo_width()
+        height = canvas.winfo_height()
+        if width < 2:
+            return
+
+        # Use the smallest cached resolution that still has a pair for every pixel
+        buckets = min((b for b in WAVEFORM_RESOLUTIONS if b >= width), default=max(WAVEFORM_RESOLUTIONS))
+        mins, maxs = reduce_waveform_peaks(*self.waveform_levels[buckets], width)
+        middle = height / 2
+        scale = middle / 32768
+        step = width / len(mins)
+
+        # One polygon: the maxima left to right, then the minima back
+        points = []
+        for i, peak in enumerate(maxs.tolist()):
+            points += [i * step, middle - peak * scale]
+        for i, peak in reversed(list(enumerate(mins.tolist()))):
+            points += [i * step, middle - peak * scale]
+        canvas.delete('all')
+        canvas.create_line(0, middle, width, middle, fill='#c0c8d8')
+        if len(points) >= 6:
+            canvas.create_polygon(points, fill='#4a7abc', outline='#4a7abc')
+        canvas.create_line(0, 0, 0, height, fill='red', tags='cursor')
+        self.update_waveform_cursor(self.media_time)
+
+    def update_waveform_cursor(self, media_time):
+        canvas = self.waveform_canvas
+        if canvas is None or self.media_length <= 0 or not canvas.winfo_exists():
+            return
+        x = media_time / self.media_length * canvas.winfo_width()
+        canvas.coords('cursor', x, 0, x, canvas.winfo_height())
+
+    def on_waveform_click(self, event):
+        if self.vlc_player and self.media_length > 0:
+            media_time = int(event.x / max(1, self.waveform_canvas.winfo_width()) * self.media_length)
+            self.vlc_player.set_time(media_time)
+            self.media_time = media_time
+            self.update_seek_bar()
+
+    def load_thumbnails(self, file_path):
+        """Read the filmstrip from the cache, or extract it with ffmpeg, off the Tk thread"""
+        self.thumbnail_times = []
+        self.thumbnail_sprite = None
+        self.thumbnail_photos = {}
+        self.memory.release_owner('thumbnails')
+        duration = self.media_probes.get(self.normalize_path(file_path), {}).get('duration')
+        token = self.scheduler.selection
+        self.scheduler.submit(get_thumbnail_strip, get_ffmpeg_path(), file_path, duration, token,
+                              pool='cpu', priority=TASK_PRIORITY_VISIBLE, token=token,
+                              on_done=lambda strip: self.show_thumbnails(file_path, strip),
+                              on_error=lambda e: print(f"Error extracting thumbnails: {e}"))
+
+    def show_thumbnails(self, file_path, strip):
+        canvas = self.filmstrip_canvas
+        if strip is None or file_path != self.current_media_file or canvas is None or not canvas.winfo_exists():
             return
+        times, sprite = strip
+        self.thumbnail_times = times
+        self.thumbnail_sprite = sprite
+        self.thumbnail_photos = {}
+        # The whole strip is a single image, so drawing it is one canvas item
+        self.filmstrip_photo = ImageTk.PhotoImage(sprite)
+        self.memory.release_owner('thumbnails')
+        self.memory.charge('thumbnails', 'sprite', estimate_content_size(sprite))
+        self.memory.charge('thumbnails', 'strip', photo_size(sprite.width, sprite.height))
+        canvas.delete('all')
+        canvas.create_image(0, 0, anchor=tk.NW, image=self.filmstrip_photo)
+        canvas.configure(scrollregion=(0, 0, sprite.width, sprite.height))
+
+    def get_thumbnail_index(self, seconds):
+        return max(0, bisect.bisect_right(self.thumbnail_times, seconds) - 1)
+
+    def on_filmstrip_click(self, event):
+        index = int(self.filmstrip_canvas.canvasx(event.x) // THUMBNAIL_WIDTH)
+        if self.vlc_player and index < len(self.thumbnail_times):
+            media_time = int(self.thumbnail_times[index] * 1000)
+            self.vlc_player.set_time(media_time)
+            self.media_time = media_time
+            self.update_seek_bar()
+
+    def show_seek_preview(self, event):
+        """Show the keyframe under the mouse above the seek bar"""
+        if not self.thumbnail_times or self.media_length <= 0:
+            return
+        fraction = min(max(event.x / max(1, self.seek_slider.winfo_width()), 0), 1)
+        index = self.get_thumbnail_index(fraction * self.media_length / 1000)
+        photo = self.thumbnail_photos.get(index)
+        if photo is None:
+            left = index * THUMBNAIL_WIDTH
+            tile = self.thumbnail_sprite.crop((left, 0, left + THUMBNAIL_WIDTH, THUMBNAIL_HEIGHT))
+            photo = self.thumbnail_photos[index] = ImageTk.PhotoImage(tile)
+            # Previews are recreated from the sprite, so they can go when memory is short
+            self.memory.charge('thumbnails', index, photo_size(THUMBNAIL_WIDTH, THUMBNAIL_HEIGHT),
+                               lambda key: self.thumbnail_photos.pop(key, None))
+        self.thumbnail_preview.config(image=photo)
+        self.thumbnail_preview.place(in_=self.seek_slider, x=event.x, y=0, anchor=tk.S)
+        self.thumbnail_preview.lift()
 
+    def update_seek_bar(self):
         try:
             # Check if widgets still exist
             if not self.time_label.winfo_exists():
                 return
-                
-            if self.vlc_player:
-                media_length = self.vlc_player.get_length()
-                media_time = self.vlc_player.get_time()
-                
-                if media_length > 0 and media_time >= 0:
-                    # Update seek bar position
-                    position = media_time / media_length * 100
-                    self.seek_var.set(position)
-                    
-                    # Update time labels
-                    current_time = self.format_time(media_time)
-                    total_time = self.format_time(media_length)
-                    self.time_label.config(text=f"{current_time} / {total_time}")
-                    
-                    # Update play button state
-                    state = self.vlc_player.get_state()
-                    if state == vlc.State.Playing:
-                        self.media_playing = True
-                        if self.play_btn.winfo_exists():
-                            self.play_btn.config(text="Pause")
-                    else:
-                        self.media_playing = False
-                        if self.play_btn.winfo_exists():
-                            self.play_btn.config(text="Play")
-        
+
+            media_length = self.media_length
+            media_time = self.media_time
+            if media_length > 0 and media_time >= 0:
+                # Update seek bar position
+                position = media_time / media_length * 100
+                self.seek_var.set(position)
+
+                # Update time labels
+                current_time = self.format_time(media_time)
+                total_time = self.format_time(media_length)
+                self.time_label.config(text=f"{current_time} / {total_time}")
+                self.update_caption_overlay(media_time)
+                self.update_waveform_cursor(media_time)
+
         except Exception as e:
             print(f"Error in update_seek_bar: {e}")
-            return
-        
-
-        
-        # Schedule next update only if window still exists
-        if hasattr(self, 'root') and self.root.winfo_exists():
-            self.root.after(500, self.update_seek_bar)
 
     def format_time(self, milliseconds):
         seconds = milliseconds // 1000
@@ -1182,50 +4020,244 @@ class FileOrganizerApp:
     def show_context_menu(self, event):
         item = self.tree.identify_row(event.y)
         if item:
-            self.tree.selection_set(item)
-            item_path = self.tree.item(item, 'values')[0]
+            # Right-clicking inside a multiple selection keeps it, so the action applies to all of it
+            if item not in self.tree.selection():
+                self.tree.selection_set(item)
+            values = self.tree.item(item, 'values')
+            if not values:
+                return
+            item_path = values[0]
             norm_path = self.normalize_path(item_path)
+            count = len(self.get_selected_paths())
+            many = f" ({count} items)" if count > 1 else ""
             self.context_menu.delete(0, tk.END)
             if norm_path in self.unlocked_items:
-                self.context_menu.add_command(label="Relock", command=self.relock_item)
+                self.context_menu.add_command(label="Relock" + many, command=self.relock_item)
             elif norm_path in self.passwords or norm_path in self.temp_passwords:
                 self.context_menu.add_command(label="Unlock", command=self.unlock_item)
-                self.context_menu.add_command(label="Hide", command=self.hide_item)
+                self.context_menu.add_command(label="Hide" + many, command=self.hide_item)
             else:
-                self.context_menu.add_command(label="Set Password", command=self.set_password)
-                self.context_menu.add_command(label="Set TEMP Lock", command=self.set_temp_password)
-                self.context_menu.add_command(label="Hide", command=self.hide_item)
+                # Locked rows in the selection are left out, so their locks can't be replaced
+                count = len(self.get_lockable_paths(self.get_selected_paths()))
+                many = f" ({count} items)" if count > 1 else ""
+                self.context_menu.add_command(label="Set Password" + many, command=self.set_password)
+                self.context_menu.add_command(label="Set TEMP Lock" + many, command=self.set_temp_password)
+                self.context_menu.add_command(label="Hide" + many, command=self.hide_item)
+            if os.path.isdir(item_path) and self.is_item_unlocked(item_path):
+                self.context_menu.add_separator()
+                self.context_menu.add_command(label="Play folder", command=self.play_folder)
+                self.context_menu.add_command(label="Generate captions for folder", command=self.generate_folder_captions)
+                self.context_menu.add_command(label="Lock Matching...", command=self.lock_matching)
+                self.context_menu.add_command(label="Hide Matching...", command=self.hide_matching)
             self.context_menu.post(event.x_root, event.y_root)
 
+    def get_selected_paths(self):
+        paths = []
+        for item in self.tree.selection():
+            values = self.tree.item(item, 'values')
+            if values:  # Not the 'Loading...' rows
+                paths.append(values[0])
+        return paths
+
+    def get_lockable_paths(self, paths):
+        """The paths a new lock or hide may apply to - never locked items or ones that already have a lock"""
+        lockable = []
+        for path in paths:
+            norm_path = self.normalize_path(path)
+            if norm_path in self.passwords or norm_path in self.temp_passwords:
+                continue
+            if self.is_item_unlocked(path):
+                lockable.append(path)
+        return lockable
+
     def set_password(self):
-        selection = self.tree.selection()
-        if not selection:
+        paths = self.get_lockable_paths(self.get_selected_paths())
+        if not paths:
             return
-        item_path = self.normalize_path(self.tree.item(selection[0], 'values')[0])
         password = simpledialog.askstring("Set Password", "Enter password:", show='*')
         if password:
-            hashed_password = hashlib.sha256(password.encode()).hexdigest()
-            self.passwords[item_path] = hashed_password
-            if item_path in self.unlocked_items:
-                self.unlocked_items.remove(item_path)
-            self.save_passwords()
-            messagebox.showinfo("Success", "Password set successfully!")
-            self.refresh_tree()
+            def done(hashed_password):
+                self.lock_paths(paths, hashed_password)
+                messagebox.showinfo("Success", "Password set successfully!" if len(paths) == 1
+                                    else f"Password set on {len(paths)} items!")
+
+            self.run_password_task(hash_password, (password,), done)
 
     def set_temp_password(self):
-        selection = self.tree.selection()
-        if not selection:
+        paths = self.get_lockable_paths(self.get_selected_paths())
+        if not paths:
             return
-        item_path = self.tree.item(selection[0], 'values')[0]
         password = simpledialog.askstring("Set TEMP Lock", "Enter password:", show='*')
         if password:
-            hashed_password = hashlib.sha256(password.encode()).hexdigest()
-            self.temp_passwords[item_path] = hashed_password
-            if item_path in self.unlocked_items:
-                self.unlocked_items.remove(item_path)  # <-- Remove from unlocked!
-            self.save_temp_passwords()
-            messagebox.showinfo("Success", "TEMP Lock set successfully!")
-            self.refresh_tree()
+            def done(hashed_password):
+                self.lock_paths(paths, hashed_password, temp=True)
+                messagebox.showinfo("Success", "TEMP Lock set successfully!" if len(paths) == 1
+                                    else f"TEMP Lock set on {len(paths)} items!")
+
+            self.run_password_task(hash_password, (password,), done)
+
+    def run_password_task(self, fn, args, on_done):
+        """Hash or check a password on the cpu pool - the key derivation is slow on purpose"""
+        self.root.config(cursor='watch')
+
+        def done(result):
+            self.root.config(cursor='')
+            on_done(result)
+
+        def failed(e):
+            self.root.config(cursor='')
+            messagebox.showerror("Error", f"Password check failed: {e}")
+
+        self.scheduler.submit(fn, *args, pool='cpu', priority=TASK_PRIORITY_VISIBLE, on_done=done, on_error=failed)
+
+    def lock_paths(self, paths, hashed_password, temp=False):
+        """Lock many items as one batch - one file write and one tree refresh however many there are.
+
+        Items that are locked or already have a lock are skipped, so a lock is never replaced.
+        """
+        locks = self.temp_passwords if temp else self.passwords
+        changed = {}
+        for path in self.get_lockable_paths(paths):
+            norm_path = self.normalize_path(path)
+            locks[norm_path] = changed[norm_path] = hashed_password
+            self.unlocked_items.discard(norm_path)  # <-- Remove from unlocked!
+            # The new lock covers whatever was unlocked inside the folder, so lock that again too
+            if os.path.isdir(path):
+                self.unlocked_items.difference_update(self.get_locks_under(path))
+        self.save_state('temp_passwords' if temp else 'passwords', changed)
+        self.refresh_tree()
+
+    def hide_paths(self, paths, keep_locked=False):
+        """Hide many items as one batch. Locked items are skipped unless keep_locked is set,
+        which is only for the single row the Hide menu entry was picked on.
+        """
+        if not keep_locked:
+            paths = self.get_lockable_paths(paths)
+        if not paths:
+            return
+        hidden = {self.normalize_path(path): True for path in paths}
+        self.hidden_items.update(hidden)
+        self.save_state('hidden', hidden)
+        self.refresh_tree()
+
+    def unhide_paths(self, paths):
+        shown = {self.normalize_path(path) for path in paths}
+        self.hidden_items.difference_update(shown)
+        self.save_state('hidden', removed=shown)
+        self.refresh_tree()
+
+    def open_hidden_items(self):
+        """List the hidden items so they can be shown in the tree again"""
+        window = tk.Toplevel(self.root)
+        window.title("Hidden Items")
+        window.geometry("600x350")
+
+        list_frame = ttk.Frame(window)
+        list_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        listbox = tk.Listbox(list_frame, selectmode=tk.EXTENDED, font=self.default_font)
+        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=listbox.yview)
+        listbox.configure(yscrollcommand=scrollbar.set)
+        listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        def fill():
+            listbox.delete(0, tk.END)
+            for path in sorted(self.hidden_items):
+                listbox.insert(tk.END, path)
+
+        def unhide():
+            paths = [listbox.get(index) for index in listbox.curselection()]
+            if paths:
+                self.unhide_paths(paths)
+                fill()
+
+        button_frame = ttk.Frame(window)
+        button_frame.pack(fill=tk.X, padx=10, pady=5)
+        ttk.Button(button_frame, text="Unhide Selected", command=unhide).pack(side=tk.LEFT)
+        ttk.Button(button_frame, text="Close", command=window.destroy).pack(side=tk.RIGHT)
+        fill()
+
+    def find_matching_paths(self, folder, pattern, token, progress, done):
+        """Runs on its own thread. Passes done() the visible files and folders anywhere under `folder`
+        whose name matches a wildcard pattern like *.pdf. Nothing inside a locked folder is matched.
+        """
+        matches = []
+        scanned = 0
+        reported = time.monotonic()
+        for dirpath, dirnames, filenames in os.walk(folder):
+            if token.cancelled:
+                return
+            # Locked folders are neither searched nor matched
+            dirnames[:] = [d for d in dirnames if not d.startswith('.')
+                           and self.is_item_visible(os.path.join(dirpath, d))
+                           and self.is_item_unlocked(os.path.join(dirpath, d))]
+            for name in dirnames + filenames:
+                if not name.startswith('.') and fnmatch.fnmatch(name.lower(), pattern.lower()):
+                    path = os.path.join(dirpath, name)
+                    if self.is_item_visible(path) and self.is_item_unlocked(path):
+                        matches.append(path)
+            scanned += len(dirnames) + len(filenames)
+            if time.monotonic() - reported > 0.5:
+                reported = time.monotonic()
+                progress(f"Searched {scanned} items, {len(matches)} match...")
+        done(matches)
+
+    def ask_matching_paths(self, title, action, on_matches):
+        """Ask for a pattern, search the selected folder in the background and pass the matches on once confirmed"""
+        selection = self.tree.selection()
+        if not selection:
+            return
+        folder = self.tree.item(selection[0], 'values')[0]
+        pattern = simpledialog.askstring(title, f"{action} every file and folder under\n{folder}\n"
+                                                "whose name matches (for example *.pdf):")
+        if not pattern:
+            return
+        pattern = pattern.strip()
+
+        window = tk.Toplevel(self.root)
+        window.title(title)
+        window.transient(self.root)
+        status_label = ttk.Label(window, text=f"Searching {folder}...")
+        status_label.pack(fill=tk.X, padx=10, pady=10)
+        ttk.Button(window, text="Cancel", command=window.destroy).pack(pady=(0, 10))
+        token = CancelToken()
+        # Closing the window stops the search
+        window.bind('<Destroy>', lambda e: token.cancel() if e.widget is window else None)
+
+        def progress(text):
+            if window.winfo_exists():
+                status_label.config(text=text)
+
+        def finished(matches):
+            if token.cancelled or not window.winfo_exists():
+                return
+            window.destroy()
+            # Items that already have a lock are left alone
+            matches = self.get_lockable_paths(matches)
+            if not matches:
+                messagebox.showinfo("Info", f"Nothing unlocked under this folder matches {pattern}.")
+            elif messagebox.askyesno(title, f"{action} {len(matches)} items matching {pattern}?"):
+                on_matches(matches)
+
+        self.scheduler.spawn(self.find_matching_paths, folder, pattern, token,
+                             lambda text: self.scheduler.post(progress, text),
+                             lambda matches: self.scheduler.post(finished, matches))
+
+    def lock_matching(self):
+        def lock(matches):
+            password = simpledialog.askstring("Set Password", "Enter password:", show='*')
+            if password:
+                def done(hashed_password):
+                    self.lock_paths(matches, hashed_password)
+                    messagebox.showinfo("Success", f"Password set on {len(matches)} items!")
+
+                # One salted hash for the whole batch
+                self.run_password_task(hash_password, (password,), done)
+
+        self.ask_matching_paths("Lock Matching", "Lock", lock)
+
+    def hide_matching(self):
+        self.ask_matching_paths("Hide Matching", "Hide", self.hide_paths)
 
     def unlock_item(self):
         selection = self.tree.selection()
@@ -1236,31 +4268,42 @@ class FileOrganizerApp:
         if norm_path in self.passwords:
             password = simpledialog.askstring("Unlock Item", "Enter password:", show='*')
             if password:
-                hashed_password = hashlib.sha256(password.encode()).hexdigest()
-                if hashed_password == self.passwords[norm_path]:
-                    self.unlocked_items.add(norm_path)
-                    messagebox.showinfo("Success", "Item unlocked successfully!")
-                    self.refresh_tree()
-                    # Reselect the item and show its content
-                    for item in self.tree.get_children():
-                        self._reselect_and_display(item, norm_path)
-                    self.apply_control_rules()
-                else:
-                    messagebox.showerror("Error", "Incorrect password!")
+                stored = self.passwords[norm_path]
+
+                def verified(result):
+                    matches, new_hash = result
+                    if matches:
+                        # Old unsalted or weaker hashes are replaced now that the password is known
+                        if new_hash and self.passwords.get(norm_path) == stored:
+                            self.passwords[norm_path] = new_hash
+                            self.save_state('passwords', {norm_path: new_hash})
+                        self.unlocked_items.add(norm_path)
+                        messagebox.showinfo("Success", "Item unlocked until the app is closed.")
+                        self.refresh_tree()
+                        # Reselect the item and show its content
+                        for item in self.tree.get_children():
+                            self._reselect_and_display(item, norm_path)
+                        self.apply_control_rules()
+                    else:
+                        messagebox.showerror("Error", "Incorrect password!")
+
+                self.run_password_task(password_verifier.verify, (password, stored), verified)
         elif norm_path in self.temp_passwords:
             password = simpledialog.askstring("Unlock TEMP Item", "Enter password:", show='*')
             if password:
-                hashed_password = hashlib.sha256(password.encode()).hexdigest()
-                if hashed_password == self.temp_passwords[norm_path]:
-                    del self.temp_passwords[norm_path]
-                    self.save_temp_passwords()
-                    messagebox.showinfo("Success", "TEMP lock removed and item unlocked!")
-                    self.refresh_tree()
-                    for item in self.tree.get_children():
-                        self._reselect_and_display(item, norm_path)
-                    self.apply_control_rules()
-                else:
-                    messagebox.showerror("Error", "Incorrect password!")
+                def verified(result):
+                    if result[0] and norm_path in self.temp_passwords:
+                        del self.temp_passwords[norm_path]
+                        self.save_state('temp_passwords', removed=[norm_path])
+                        messagebox.showinfo("Success", "TEMP lock removed and item unlocked!")
+                        self.refresh_tree()
+                        for item in self.tree.get_children():
+                            self._reselect_and_display(item, norm_path)
+                        self.apply_control_rules()
+                    else:
+                        messagebox.showerror("Error", "Incorrect password!")
+
+                self.run_password_task(password_verifier.verify, (password, self.temp_passwords[norm_path]), verified)
         else:
             messagebox.showinfo("Info", "This item is not password protected.")
 
@@ -1281,18 +4324,21 @@ class FileOrganizerApp:
         return False
 
     def relock_item(self):
-        selection = self.tree.selection()
-        if not selection:
+        paths = [path for path in self.get_selected_paths() if self.normalize_path(path) in self.unlocked_items]
+        if not paths:
             return
-        item_path = self.tree.item(selection[0], 'values')[0]
-        norm_path = self.normalize_path(item_path)
-        if norm_path in self.unlocked_items:
-            self.unlocked_items.remove(norm_path)
-            messagebox.showinfo("Relocked", "Item has been relocked.")
-            self.refresh_tree()
-            # Optionally, show the not accessible message if it's a file
-            if os.path.isfile(item_path):
-                self.show_not_accessible_message(item_path)
+        relocked = {self.normalize_path(path) for path in paths}
+        # Relocking a folder also relocks whatever was unlocked inside it
+        for path in paths:
+            if os.path.isdir(path):
+                relocked.update(self.get_locks_under(path))
+        self.unlocked_items.difference_update(relocked)
+        messagebox.showinfo("Relocked", "Item has been relocked." if len(paths) == 1
+                            else f"{len(paths)} items have been relocked.")
+        self.refresh_tree()
+        # Optionally, show the not accessible message if it's a file
+        if os.path.isfile(paths[0]):
+            self.show_not_accessible_message(paths[0])
 
     def is_item_unlocked(self, item_path):
         """Check if an item is unlocked by verifying its path and parent directories"""
@@ -1315,13 +4361,10 @@ class FileOrganizerApp:
         return True
 
     def hide_item(self):
-        selection = self.tree.selection()
-        if not selection:
-            return
-        item_path = self.tree.item(selection[0], 'values')[0]
-        norm_path = self.normalize_path(item_path)
-        self.hidden_items.add(norm_path)
-        self.refresh_tree()
+        paths = self.get_selected_paths()
+        if paths:
+            # A locked item can still be hidden on its own, as before multi-select
+            self.hide_paths(paths, keep_locked=len(paths) == 1)
 
     def is_item_visible(self, item_path):
         # Control rules take priority
@@ -1436,37 +4479,43 @@ class FileOrganizerApp:
         if self.current_directory:
             self.populate_tree(self.current_directory)
     
-    def save_passwords(self):
+    def get_locks_under(self, folder):
+        """Normalized paths of the locked items below a folder, from a range query on the store"""
+        try:
+            return set(state_store.under('passwords', folder))
+        except Exception as e:
+            print(f"Error reading locks under {folder}: {e}")
+            return set()
+
+    def save_state(self, namespace, changed=None, removed=()):
+        """Write only the keys that changed - the rest of the store is left alone"""
         try:
-            with open('passwords.json', 'w') as file:
-                json.dump(self.passwords, file)
+            state_store.update(namespace, changed, removed)
         except Exception as e:
-            print(f"Error saving passwords: {e}")
+            print(f"Error saving {namespace}: {e}")
 
     def load_passwords(self):
         try:
-            if os.path.exists('passwords.json'):
-                with open('passwords.json', 'r') as file:
-                    self.passwords = json.load(file)
+            self.passwords = state_store.get_all('passwords')
         except Exception as e:
             print(f"Error loading passwords: {e}")
             self.passwords = {}
 
     def load_temp_passwords(self):
         try:
-            if os.path.exists('temp_passwords.json'):
-                with open('temp_passwords.json', 'r') as file:
-                    self.temp_passwords = json.load(file)
+            self.temp_passwords = state_store.get_all('temp_passwords')
         except Exception as e:
             print(f"Error loading temp passwords: {e}")
             self.temp_passwords = {}
 
-    def save_temp_passwords(self):
+    def load_item_states(self):
+        """Hidden items from the last session. Unlocks only last for the session they were made in."""
         try:
-            with open('temp_passwords.json', 'w') as file:
-                json.dump(self.temp_passwords, file)
+            self.hidden_items = set(state_store.get_all('hidden'))
+            # Drop unlocks an earlier version saved
+            state_store.update('unlocked', removed=list(state_store.get_all('unlocked')))
         except Exception as e:
-            print(f"Error saving temp passwords: {e}")
+            print(f"Error loading hidden items: {e}")
 
     def setup_menu(self):
         menubar = tk.Menu(self.root)
@@ -1481,6 +4530,14 @@ class FileOrganizerApp:
         file_menu.add_separator()
         file_menu.add_command(label="Exit", command=self.root.quit)
 
+        tools_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="Tools", menu=tools_menu)
+        tools_menu.add_command(label="Search Transcripts", command=self.open_transcript_search)
+        tools_menu.add_command(label="Find Duplicates", command=self.open_duplicate_finder)
+        tools_menu.add_command(label="Disk Usage", command=self.open_disk_usage)
+        tools_menu.add_command(label="Hidden Items...", command=self.open_hidden_items)
+        tools_menu.add_command(label="Memory Budget...", command=self.set_memory_budget)
+
     def load_initial_directory(self):
         # Check if custom folder is set first
         if self.custom_root_folder and os.path.exists(self.custom_root_folder):
@@ -1495,16 +4552,15 @@ class FileOrganizerApp:
             
         self.populate_tree(self.current_directory)
 
-    def load_custom_folder(self):
-        """Load the custom folder setting from file"""
-        settings_file = 'settings.json'
+    def load_settings(self):
+        """Load the custom folder and memory budget settings from the state store"""
         try:
-            if os.path.exists(settings_file):
-                with open(settings_file, 'r') as file:
-                    settings = json.load(file)
-                    self.custom_root_folder = settings.get('custom_root_folder', None)
+            settings = state_store.get_all('settings')
+            self.custom_root_folder = settings.get('custom_root_folder', None)
+            budget = max(MEMORY_BUDGET_MIN_MB, int(settings.get('memory_budget_mb', MEMORY_BUDGET_MB)))
+            self.memory.set_budget(budget * 1024 * 1024)
         except Exception as e:
-            print(f"Error loading custom folder setting: {e}")
+            print(f"Error loading settings: {e}")
             self.custom_root_folder = None
 
     # Add this new method
@@ -1517,7 +4573,7 @@ class FileOrganizerApp:
             self.custom_root_folder = folder
             self.current_directory = folder
             self.populate_tree(folder)
-            self.save_custom_folder()
+            self.save_settings()
 
     def go_to_script_drive(self):
             """Set current directory to the drive where the script is located."""
@@ -1527,13 +4583,42 @@ class FileOrganizerApp:
                 self.current_directory = drive_root
                 self.populate_tree(drive_root)
 
-    def save_custom_folder(self):
-        settings_file = 'settings.json'
-        try:
-            with open(settings_file, 'w') as file:
-                json.dump({'custom_root_folder': self.custom_root_folder}, file)
-        except Exception as e:
-            print(f"Error saving custom folder setting: {e}")
+    def save_settings(self):
+        self.save_state('settings', {'custom_root_folder': self.custom_root_folder,
+                                     'memory_budget_mb': self.memory.budget // (1024 * 1024)})
+
+    def set_memory_budget(self):
+        budget = simpledialog.askinteger(
+            "Memory Budget",
+            "Memory for cached and displayed content (MB):",
+            initialvalue=self.memory.budget // (1024 * 1024),
+            minvalue=MEMORY_BUDGET_MIN_MB
+        )
+        if budget:
+            self.memory.set_budget(budget * 1024 * 1024)
+            self.save_settings()
+
+    def update_memory_status(self):
+        usage = self.memory.usage()
+        parts = ", ".join(f"{owner} {format_size(size)}" for owner, size in sorted(usage.items()) if size)
+        text = f"Memory: {format_size(self.memory.used)} of {format_size(self.memory.budget)}"
+        self.memory_status.config(text=f"{text} ({parts})" if parts else text)
+
+    def release_viewer_memory(self):
+        """Drop the images the previous file pinned on self, so they don't outlive its display"""
+        img, self.img = self.img, None
+        self.tk_img = None
+        self.pdf_images = {}
+        self.pdf_pages = {}
+        self.thumbnail_sprite = None
+        self.thumbnail_photos = {}
+        self.filmstrip_photo = None
+        for owner in ('image', 'pdf', 'thumbnails'):
+            self.memory.release_owner(owner)
+        # Hand the decoded image back to the cache so stepping back to it is immediate
+        if img is not None and self.img_path:
+            self.prefetch_cache.put(self.img_path, 'image', img, estimate_content_size(img))
+        self.img_path = None
 
     def get_display_name(self, item_path):
         base = os.path.basename(item_path)
@@ -1551,130 +4636,237 @@ class FileOrganizerApp:
         return os.path.normcase(os.path.abspath(os.path.normpath(path)))
     
     def generate_captions(self, file_path):
+        # Captions for this file were already found in the cache
+        if self.caption_track is not None and file_path == self.current_media_file:
+            self.update_caption_intervals()
+            return
+        # Already running - the live display shows its progress
+        if file_path in self.caption_jobs:
+            return
+
+        job = {
+            'file': file_path,
+            'lock': threading.Lock(),
+            'info': {},  # Filled with the media duration by the silence scan
+            'chunk_words': {},  # chunk index -> finished words
+            'partial': {},  # chunk index -> text of the utterance in progress
+            'consumed': {},  # chunk index -> seconds of audio fed to the recognizer
+            'done_chunks': set(),
+            'cancelled': False,
+            'cancel_event': None,
+            'refresh_pending': False,
+            'shown_closed': 0,  # Closed caption lines already in the Text widget
+            'shown_interval': None,
+        }
+        self.caption_jobs[file_path] = job
+
         def conversion_thread():
             try:
-                # Get the selected interval from GUI
-                interval = int(self.interval_var.get())
-                
                 # 1. Set path to ffmpeg.exe
-                ffmpeg_path = os.path.join(
-                    os.path.dirname(__file__),
-                    "ffmpeg",
-                    "bin",
-                    "ffmpeg.exe"
-                )
+                ffmpeg_path = get_ffmpeg_path()
                 
                 # Verify FFmpeg exists
                 if not os.path.exists(ffmpeg_path):
-                    self.root.after(0, lambda: messagebox.showerror(
-                        "Error",
-                        "FFmpeg not found at:\n{}\nPlease download from https://ffmpeg.org/".format(ffmpeg_path)
-                    ))
-                    return
+                    raise FileNotFoundError(
+                        "FFmpeg not found at:\n{}\nPlease download from https://ffmpeg.org/".format(ffmpeg_path))
 
-                # 2. Extract audio to WAV
-                temp_wav = os.path.join(os.path.dirname(file_path), "temp_audio.wav")
-                cmd = [
-                    ffmpeg_path,
-                    '-i', file_path,
-                    '-ac', '1',  # Mono audio
-                    '-ar', '16000',  # 16kHz sample rate
-                    '-y',  # Overwrite without asking
-                    temp_wav
-                ]
-                
-                # Run FFmpeg
-                subprocess.run(
-                    cmd,
-                    check=True,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    creationflags=subprocess.CREATE_NO_WINDOW
-                )
-
-                # 3. Load Vosk model
-                model_path = os.path.join(
-                    os.path.dirname(__file__),
-                    "vosk-model",
-                    "vosk-model-small-en-us-0.15"
-                )
+                # 2. Check for the Vosk model
+                model_path = get_vosk_model_path()
                 
                 if not os.path.exists(model_path):
-                    self.root.after(0, lambda: messagebox.showerror(
-                        "Error", 
-                        "Vosk model not found at:\n{}\nDownload from https://alphacephei.com/vosk/models".format(model_path)
-                    ))
-                    return
+                    raise FileNotFoundError(
+                        "Vosk model not found at:\n{}\nDownload from https://alphacephei.com/vosk/models".format(model_path))
+
+                # 3. Transcribe the file, or reuse an earlier transcript of it. The workers
+                # stream their progress through `updates` while they run.
+                manager = get_caption_manager()
+                updates = manager.Queue()
+                job['cancel_event'] = manager.Event()
+                if job['cancelled']:
+                    job['cancel_event'].set()
+
+                relay = self.scheduler.spawn(self.relay_caption_updates, job, updates)
+                try:
+                    words = transcribe_media(ffmpeg_path, model_path, file_path, updates=updates,
+                                             cancel_event=job['cancel_event'], info=job['info'])
+                finally:
+                    updates.put(None)
+                    relay.join()
+
+                # 4. Update UI
+                self.scheduler.post(lambda: self.finish_caption_job(job, words=words))
+
+            except CaptionCancelled:
+                self.scheduler.post(lambda: self.finish_caption_job(job))
+            except Exception as err:
+                error_message = str(err)  # Capture the error message
+                self.scheduler.post(lambda: self.finish_caption_job(job, error=error_message))
 
-                model = Model(model_path)
-                wf = wave.open(temp_wav, 'rb')
-                rec = KaldiRecognizer(model, wf.getframerate())
-                rec.SetWords(True)
+        # Start the job - it mostly waits on the caption workers
+        self.scheduler.spawn(conversion_thread)
+        self.show_caption_job_controls(job)
 
-                # 4. Process audio with dynamic interval grouping
-                results = []
-                current_segment = []
-                current_segment_start = 0
-                
-                while True:
-                    data = wf.readframes(4000)
-                    if len(data) == 0:
-                        break
-                        
-                    if rec.AcceptWaveform(data):
-                        result = json.loads(rec.Result())
-                        if 'result' in result:
-                            for word in result['result']:
-                                # If this is the first word or we've reached the interval
-                                if not current_segment or word['start'] >= current_segment_start + interval:
-                                    if current_segment:  # If we have a previous segment, format and add it
-                                        timestamp = "{:02d}:{:02d}:{:02d}".format(
-                                            int(current_segment_start//3600),
-                                            int((current_segment_start%3600)//60),
-                                            int(current_segment_start%60)
-                                        )
-                                        results.append(f"[{timestamp}] {' '.join(current_segment)}\n")
-                                        current_segment = []
-                                    # Align to the selected interval boundary
-                                    current_segment_start = word['start'] - (word['start'] % interval)
-                                    
-                                current_segment.append(word['word'])
-
-                # Add the final segment if it exists
-                if current_segment:
-                    timestamp = "{:02d}:{:02d}:{:02d}".format(
-                        int(current_segment_start//3600),
-                        int((current_segment_start%3600)//60),
-                        int(current_segment_start%60)
-                    )
-                    results.append(f"[{timestamp}] {' '.join(current_segment)}\n")
-
-                # Get any remaining final result
-                final_result = json.loads(rec.FinalResult())
-                if final_result.get('text'):
-                    results.append(final_result['text'])
-
-                # 5. Clean up
-                wf.close()
-                os.remove(temp_wav)
-
-                # 6. Update UI
-                self.generated_captions = "\n".join(results)  # Join with newlines between segments
-                self.root.after(0, self.update_caption_display)
+    def cancel_captions(self, file_path):
+        job = self.caption_jobs.get(file_path)
+        if job is None:
+            return
+        job['cancelled'] = True
+        if job['cancel_event'] is not None:
+            job['cancel_event'].set()
+        if file_path == self.current_media_file and self.caption_status_label.winfo_exists():
+            self.caption_status_label.config(text="Cancelling...")
+            self.caption_cancel_btn.config(state=tk.DISABLED)
+
+    def relay_caption_updates(self, job, updates):
+        """Collect the messages sent by the chunk workers until the job puts None"""
+        while True:
+            message = updates.get()
+            if message is None:
+                break
+            kind, index, value = message
+            with job['lock']:
+                if kind == 'words':
+                    job['chunk_words'].setdefault(index, []).extend(value)
+                    job['partial'][index] = ""
+                elif kind == 'partial':
+                    job['partial'][index] = value
+                elif kind == 'progress':
+                    job['consumed'][index] = value
+                elif kind == 'done':
+                    job['consumed'][index] = value
+                    job['done_chunks'].add(index)
+            self.schedule_live_caption_refresh(job)
+
+    def schedule_live_caption_refresh(self, job):
+        # Coalesce bursts of worker messages into one UI refresh
+        with job['lock']:
+            if job['refresh_pending']:
+                return
+            job['refresh_pending'] = True
+        self.scheduler.post(self.refresh_live_captions, job)
 
-            except Exception as err:
-                error_message = str(err)  # Capture the error message
-                self.root.after(0, lambda: messagebox.showerror(
-                    "Error",
-                    f"Caption generation failed:\n{error_message}"
-                ))
+    def show_caption_job_controls(self, job):
+        if job['file'] != self.current_media_file or not self.caption_text.winfo_exists():
+            return
+        self.caption_cancel_btn.config(state=tk.DISABLED if job['cancelled'] else tk.NORMAL)
+        self.caption_status_label.config(text="Cancelling..." if job['cancelled'] else "Starting...")
+        self.caption_progress['value'] = 0
+        # Rebuild the text from scratch on the next refresh
+        job['shown_interval'] = None
+        self.schedule_live_caption_refresh(job)
+
+    def refresh_live_captions(self, job):
+        """Show the words transcribed so far, in order, followed by the current partial result"""
+        with job['lock']:
+            job['refresh_pending'] = False
+            # Chunks finish out of order - only show words up to the first unfinished chunk
+            words = []
+            index = 0
+            while True:
+                words.extend(job['chunk_words'].get(index, []))
+                if index not in job['done_chunks']:
+                    break
+                index += 1
+            partial = job['partial'].get(index, "")
+            consumed = sum(job['consumed'].values())
+            duration = job['info'].get('duration')
 
-        # Start the thread
-        threading.Thread(target=conversion_thread, daemon=True).start()
-        messagebox.showinfo(
-            "Processing",
-            f"Generating captions with {self.interval_var.get()}-second intervals...\nThis may take several minutes for long files."
-        )
+        if (job['file'] != self.current_media_file or self.caption_jobs.get(job['file']) is not job
+                or not self.caption_text.winfo_exists()):
+            return
+
+        if duration:
+            fraction = min(1.0, consumed / duration)
+            self.caption_progress['value'] = fraction
+            if not job['cancelled']:
+                self.caption_status_label.config(text=f"Transcribing... {int(fraction * 100)}%")
+
+        interval = int(self.interval_var.get())
+        segments = group_caption_segments(words, interval)
+        closed = segments[:-1]
+        live = segments[-1] if segments else ""
+
+        text = self.caption_text
+        text.config(state=tk.NORMAL)
+        if job['shown_interval'] != interval or job['shown_closed'] > len(closed):
+            text.delete(1.0, tk.END)
+            text.mark_set('live', '1.0')
+            text.tag_configure('partial', foreground='gray')
+            job['shown_interval'] = interval
+            job['shown_closed'] = 0
+
+        # Closed lines are only ever appended; the open line and partial text are redrawn
+        for line in closed[job['shown_closed']:]:
+            text.insert('live', line + "\n")
+        job['shown_closed'] = len(closed)
+        text.delete('live', tk.END)
+        text.insert(tk.END, live)
+        if partial:
+            text.insert(tk.END, partial, 'partial')
+        text.see(tk.END)
+        text.config(state=tk.DISABLED)
+
+    def finish_caption_job(self, job, words=None, error=None):
+        if self.caption_jobs.get(job['file']) is job:
+            del self.caption_jobs[job['file']]
+
+        if job['file'] == self.current_media_file and self.caption_text.winfo_exists():
+            self.caption_cancel_btn.config(state=tk.DISABLED)
+            if words is not None:
+                self.caption_progress['value'] = 1.0
+                self.caption_status_label.config(text="Done")
+                self.show_caption_words(job['file'], words)
+            elif error is None:
+                self.caption_status_label.config(text="Cancelled")
+            else:
+                self.caption_status_label.config(text="Failed")
+
+        if error is not None:
+            messagebox.showerror("Error", f"Caption generation failed:\n{error}")
+
+    def start_transcript_index(self):
+        self.scheduler.spawn(index_cached_transcripts)
+
+    def load_cached_captions(self, file_path):
+        """Show captions from an earlier run as soon as a media file is opened"""
+        # Captions for this file are still being generated - show their progress again
+        job = self.caption_jobs.get(file_path)
+        if job is not None:
+            self.show_caption_job_controls(job)
+            return
+
+        def read_cache():
+            model_path = get_vosk_model_path()
+            if not os.path.exists(model_path):
+                return None
+            return load_caption_cache(get_caption_cache_path(file_path, model_path))
+
+        def show(words):
+            if words is not None:
+                self.show_caption_words(file_path, words)
+
+        token = self.scheduler.selection
+        self.scheduler.submit(read_cache, priority=TASK_PRIORITY_VISIBLE, token=token, on_done=show,
+                              on_error=lambda e: print(f"Error checking caption cache: {e}"))
+
+    def show_caption_words(self, file_path, words):
+        # The user may have moved on to another file while captions were being generated
+        if file_path != self.current_media_file or not self.caption_text.winfo_exists():
+            return
+        self.caption_track = CaptionTrack(words)
+        self.caption_overlay_cue = -1
+        self.update_caption_intervals()
+
+    def update_caption_intervals(self, *args):
+        """Regroup the current transcript with the selected interval"""
+        job = self.caption_jobs.get(self.current_media_file)
+        if job is not None:
+            self.schedule_live_caption_refresh(job)
+            return
+        if self.caption_track is None:
+            return
+        self.generated_captions = format_caption_segments(self.caption_track.iter_words(), int(self.interval_var.get()))
+        self.update_caption_display()
 
     def update_caption_display(self):
         self.caption_text.config(state=tk.NORMAL)
@@ -1682,6 +4874,20 @@ class FileOrganizerApp:
         self.caption_text.insert(tk.END, self.generated_captions)
         self.caption_text.config(state=tk.DISABLED)
 
+    def update_caption_overlay(self, media_time):
+        if self.caption_overlay is None or self.caption_track is None or not self.caption_overlay.winfo_exists():
+            return
+        cue = self.caption_track.cue_at(media_time / 1000)
+        if cue == self.caption_overlay_cue:
+            return
+        self.caption_overlay_cue = cue
+        self.caption_overlay.config(text=self.caption_track.cue_texts[cue] if cue >= 0 else "")
+        if self.caption_overlay_placement is not None:
+            if cue >= 0:
+                self.caption_overlay.place(**self.caption_overlay_placement)
+            else:
+                self.caption_overlay.place_forget()
+
     def download_generated_captions(self):
         if not self.generated_captions:
             messagebox.showwarning("Warning", "No captions generated yet")
@@ -1690,17 +4896,725 @@ class FileOrganizerApp:
         save_file = filedialog.asksaveasfilename(
             title="Save Captions As",
             defaultextension=".txt",
-            filetypes=[("Text files", "*.txt"), ("SRT files", "*.srt"), ("All files", "*.*")]
+            filetypes=[("Text files", "*.txt"), ("SRT files", "*.srt"), ("WebVTT files", "*.vtt"), ("All files", "*.*")]
         )
         
         if save_file:
+            # Subtitle formats are written from the word timings, everything else as plain text
+            file_ext = os.path.splitext(save_file)[1].lower()
+            if file_ext == '.srt' and self.caption_track is not None:
+                content = self.caption_track.to_srt()
+            elif file_ext == '.vtt' and self.caption_track is not None:
+                content = self.caption_track.to_webvtt()
+            else:
+                content = self.generated_captions
             try:
                 with open(save_file, 'w', encoding='utf-8') as f:
-                    f.write(self.generated_captions)
+                    f.write(content)
                 messagebox.showinfo("Success", "Captions saved successfully!")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to save captions: {str(e)}")
 
+    def open_transcript_search(self):
+        window = tk.Toplevel(self.root)
+        window.title("Search Transcripts")
+        window.geometry("700x450")
+
+        search_frame = ttk.Frame(window)
+        search_frame.pack(fill=tk.X, padx=10, pady=5)
+        query_entry = ttk.Entry(search_frame)
+        query_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        status_label = ttk.Label(window, text=f"Searching in: {self.current_directory}")
+        status_label.pack(fill=tk.X, padx=10)
+
+        results_frame = ttk.Frame(window)
+        results_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        results = ttk.Treeview(results_frame, columns=('time', 'context'))
+        results.heading('#0', text="File")
+        results.heading('time', text="Time")
+        results.heading('context', text="Context")
+        results.column('#0', width=180)
+        results.column('time', width=70, stretch=False)
+        results.column('context', width=400)
+        scrollbar = ttk.Scrollbar(results_frame, orient=tk.VERTICAL, command=results.yview)
+        results.configure(yscrollcommand=scrollbar.set)
+        results.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        hits_by_item = {}
+
+        def show_results(query, hits):
+            if not window.winfo_exists():
+                return
+            results.delete(*results.get_children())
+            hits_by_item.clear()
+            shown = 0
+            for path, seconds, context in hits:
+                # Never reveal what is said in locked or hidden files
+                if not self.is_item_unlocked(path) or not self.is_item_visible(path):
+                    continue
+                item = results.insert('', 'end', text=os.path.basename(path),
+                                      values=(self.format_time(int(seconds * 1000)), context))
+                hits_by_item[item] = (path, seconds)
+                shown += 1
+            status_label.config(text=f"{shown} results for \"{query}\"")
+
+        def search(event=None):
+            query = query_entry.get().strip()
+            if not query:
+                return
+            status_label.config(text="Searching...")
+            root_path = self.current_directory
+
+            self.scheduler.submit(transcript_index.search, query, root_path, priority=TASK_PRIORITY_VISIBLE,
+                                  on_done=lambda hits: show_results(query, hits),
+                                  on_error=lambda e: status_label.config(text=f"Search failed: {e}"))
+
+        def open_hit(event):
+            selection = results.selection()
+            if selection and selection[0] in hits_by_item:
+                self.open_media_at(*hits_by_item[selection[0]])
+
+        ttk.Button(search_frame, text="Search", command=search).pack(side=tk.LEFT, padx=5)
+        query_entry.bind('<Return>', search)
+        results.bind('<<TreeviewSelect>>', open_hit)
+        query_entry.focus_set()
+
+    def open_disk_usage(self):
+        """Treemap of the current root, filled in as its folders are measured"""
+        root_path = self.current_directory
+        if not root_path or not os.path.isdir(root_path):
+            return
+        window = tk.Toplevel(self.root)
+        window.title(f"Disk Usage - {root_path}")
+        window.geometry("900x600")
+
+        status_label = ttk.Label(window, text="Measuring folders...")
+        status_label.pack(side=tk.BOTTOM, fill=tk.X, padx=10, pady=5)
+        canvas = tk.Canvas(window, bg='white', highlightthickness=0)
+        canvas.pack(fill=tk.BOTH, expand=True)
+
+        token = CancelToken()
+        window.bind('<Destroy>', lambda e: token.cancel() if e.widget is window else None)
+
+        # Folder sizes come from the same cache as the tree's size column, so
+        # measuring here fills in the tree and the other way round
+        root_key = self.normalize_path(root_path)
+        children = {}  # normalized folder path -> normalized paths of the measured folders in it
+
+        def index(keys):
+            for key in keys:
+                parent = os.path.dirname(key)
+                if key != root_key and (parent == root_key or parent.startswith(root_key + os.sep)):
+                    children.setdefault(parent, set()).add(key)
+
+        index(key for key in self.folder_sizes if key.startswith(root_key + os.sep))
+
+        try:
+            entries = scan_directory(root_path)
+        except OSError as e:
+            status_label.config(text=f"Error reading {root_path}: {e}")
+            return
+        root_files = sum(entry[3] for entry in entries if not entry[0])
+        folders = [entry for entry in entries if entry[0]]
+        regions = {}  # canvas item -> (normalized path, size) it stands for
+        state = {'measured': 0, 'redraw': None}
+
+        def get_size(key):
+            cached = self.folder_sizes.get(key)
+            return cached[1] if cached else None
+
+        def draw_folder(key, files_size, x, y, width, height, depth, color):
+            """Split a box between a folder's measured subfolders and its own files"""
+            items = []
+            for child in children.get(key, ()):
+                size = get_size(child)
+                if not size:
+                    continue
+                if self.is_item_visible(child) and self.is_item_unlocked(child):
+                    items.append((size, child))
+                else:  # Hidden and locked folders only count towards the unlabelled part
+                    files_size += size
+            if files_size > 0:
+                items.append((files_size, None))
+            items.sort(key=lambda item: item[0], reverse=True)
+            rects = squarify([size for size, child in items], x, y, width, height)
+            for i, ((size, child), (rx, ry, rw, rh)) in enumerate(zip(items, rects)):
+                if rw < TREEMAP_MIN_PIXELS or rh < TREEMAP_MIN_PIXELS:
+                    continue
+                fill = color or TREEMAP_COLORS[i % len(TREEMAP_COLORS)]
+                if child is None:  # The folder's own files
+                    item = canvas.create_rectangle(rx, ry, rx + rw, ry + rh, fill='#e8e8e8', outline='white')
+                    regions[item] = (key, size)
+                    continue
+                item = canvas.create_rectangle(rx, ry, rx + rw, ry + rh, fill=fill, outline='white')
+                regions[item] = (child, size)
+                label_height = 0
+                if rw > 60 and rh > 16:
+                    label = canvas.create_text(rx + 3, ry + 1, anchor=tk.NW, text=os.path.basename(child),
+                                               font=self.default_font, width=rw - 6)
+                    regions[label] = (child, size)
+                    label_height = 14
+                if depth + 1 < TREEMAP_DEPTH and rw > 4 * TREEMAP_MIN_PIXELS and rh > 4 * TREEMAP_MIN_PIXELS:
+                    # The files directly inside are the folder's size minus its measured subfolders
+                    inner_files = size - sum(get_size(c) or 0 for c in children.get(child, ()))
+                    draw_folder(child, inner_files, rx + 2, ry + 2 + label_height, rw - 4, rh - 4 - label_height,
+                                depth + 1, fill)
+
+        def redraw():
+            state['redraw'] = None
+            if not canvas.winfo_exists():
+                return
+            canvas.delete('all')
+            regions.clear()
+            draw_folder(root_key, root_files, 0, 0, canvas.winfo_width(), canvas.winfo_height(), 0, None)
+            total = root_files + sum(get_size(self.normalize_path(entry[2])) or 0 for entry in folders)
+            done = "" if state['measured'] >= len(folders) else \
+                f" - measured {state['measured']} of {len(folders)} folders"
+            status_label.config(text=f"{root_path}: {format_size(total)}{done}")
+
+        def schedule_redraw():
+            # Coalesced, so a burst of finished folders costs one redraw
+            if state['redraw'] is None and window.winfo_exists():
+                state['redraw'] = window.after(TREEMAP_REDRAW_DELAY, redraw)
+
+        def measured(sizes):
+            state['measured'] += 1
+            if sizes:
+                self.on_folder_sizes(sizes)
+                index(sizes)
+            schedule_redraw()
+
+        def failed(e):
+            print(f"Error measuring folder: {e}")
+            measured(None)
+
+        def show_region(event):
+            item = canvas.find_withtag('current')
+            if item and item[0] in regions:
+                key, size = regions[item[0]]
+                status_label.config(text=f"{key}: {format_size(size)}")
+
+        def open_region(event):
+            item = canvas.find_withtag('current')
+            if item and item[0] in regions:
+                self.reveal_path(regions[item[0]][0])
+
+        canvas.bind('<Configure>', lambda e: schedule_redraw())
+        canvas.bind('<Motion>', show_region)
+        canvas.bind('<Button-1>', open_region)
+
+        # Each top level folder is measured as its own task, so the io pool walks them in parallel
+        for is_dir, name, path, size, mtime in folders:
+            self.scheduler.submit(self.measure_folder, path, mtime, token, token=token,
+                                  on_done=measured, on_error=failed)
+        schedule_redraw()
+
+    def open_duplicate_finder(self):
+        if self.duplicate_window is not None and self.duplicate_window.winfo_exists():
+            self.duplicate_window.lift()
+            return
+        window = self.duplicate_window = tk.Toplevel(self.root)
+        window.title("Find Duplicates")
+        window.geometry("700x450")
+
+        status_label = ttk.Label(window, text=f"Scanning {self.current_directory}...")
+        status_label.pack(fill=tk.X, padx=10, pady=5)
+
+        results_frame = ttk.Frame(window)
+        results_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        results = ttk.Treeview(results_frame, columns=('size', 'wasted'))
+        results.heading('#0', text="Files")
+        results.heading('size', text="Size")
+        results.heading('wasted', text="Wasted")
+        results.column('#0', width=450)
+        results.column('size', width=90, stretch=False)
+        results.column('wasted', width=90, stretch=False)
+        scrollbar = ttk.Scrollbar(results_frame, orient=tk.VERTICAL, command=results.yview)
+        results.configure(yscrollcommand=scrollbar.set)
+        results.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        paths_by_item = {}
+        token = CancelToken()
+        # Closing the window stops the scan
+        window.bind('<Destroy>', lambda e: token.cancel() if e.widget is window else None)
+
+        def progress(text):
+            if window.winfo_exists():
+                status_label.config(text=text)
+
+        def show_results(groups):
+            if not window.winfo_exists():
+                return
+            wasted_total = 0
+            for size, paths in groups:
+                wasted = size * (len(paths) - 1)
+                wasted_total += wasted
+                group = results.insert('', 'end', text=f"{len(paths)} copies", open=True,
+                                       values=(format_size(size), format_size(wasted)))
+                for path in paths:
+                    paths_by_item[results.insert(group, 'end', text=path)] = path
+            status_label.config(text=f"{len(groups)} sets of duplicates, {format_size(wasted_total)} wasted")
+
+        def open_path(event):
+            selection = results.selection()
+            if not selection or selection[0] not in paths_by_item:
+                return
+            path = paths_by_item[selection[0]]
+            if not os.path.exists(path):
+                messagebox.showerror("Error", f"File not found:\n{path}")
+            elif not self.reveal_path(path):
+                # Outside the tree's root - still respect the lock
+                if self.is_item_unlocked(path):
+                    self.display_file(path)
+                else:
+                    self.show_not_accessible_message(path)
+
+        results.bind('<<TreeviewSelect>>', open_path)
+
+        if self.file_hashes is None:
+            self.load_file_hashes()
+        self.scheduler.spawn(self.find_duplicates, self.current_directory, token,
+                             lambda text: self.scheduler.post(progress, text),
+                             lambda groups: self.scheduler.post(show_results, groups))
+
+    def find_duplicates(self, root_path, token, progress, done):
+        """Runs on its own thread. Each stage only looks at the files the previous one could not tell apart:
+        same size, then the same first and last blocks, then the same full hash.
+        """
+        # A scan from a window that was just closed may still be winding down
+        with self.file_hashes_lock:
+            self.scan_duplicates(root_path, token, progress, done)
+
+    def scan_duplicates(self, root_path, token, progress, done):
+        try:
+            by_size = {}
+            stack = [root_path]
+            scanned = 0
+            reported = time.monotonic()
+            while stack:
+                if token.cancelled:
+                    return
+                try:
+                    with os.scandir(stack.pop()) as it:
+                        for entry in it:
+                            # Locked and hidden items are neither read nor listed
+                            if (entry.name.startswith('.') or not self.is_item_visible(entry.path)
+                                    or not self.is_item_unlocked(entry.path)):
+                                continue
+                            try:
+                                if entry.is_dir(follow_symlinks=False):
+                                    stack.append(entry.path)
+                                elif entry.is_file(follow_symlinks=False):
+                                    stat = entry.stat(follow_symlinks=False)
+                                    if stat.st_size > 0:
+                                        by_size.setdefault(stat.st_size, []).append(
+                                            (entry.path, stat.st_size, stat.st_mtime))
+                                        scanned += 1
+                            except OSError:
+                                continue
+                except OSError:
+                    continue
+                if time.monotonic() - reported > 0.5:
+                    reported = time.monotonic()
+                    progress(f"Scanning... {scanned} files")
+
+            candidates = [file for files in by_size.values() if len(files) > 1 for file in files]
+            progress(f"Comparing the first and last blocks of {len(candidates)} files...")
+            partial = self.hash_files(candidates, 'partial', partial_file_hash, token)
+            if partial is None:
+                return
+            by_partial = {}
+            for file in candidates:
+                if file[0] in partial:
+                    by_partial.setdefault((file[1], partial[file[0]]), []).append(file)
+
+            # The partial hash already covers small files completely
+            groups = {key: files for key, files in by_partial.items() if len(files) > 1}
+            candidates = [file for (size, digest), files in groups.items()
+                          if size > 2 * DUPLICATE_EDGE_BLOCK for file in files]
+            progress(f"Hashing {len(candidates)} files with matching blocks...")
+            full = self.hash_files(candidates, 'full', full_file_hash, token)
+            if full is None:
+                return
+            duplicates = []
+            for (size, digest), files in groups.items():
+                if size <= 2 * DUPLICATE_EDGE_BLOCK:
+                    duplicates.append((size, sorted(file[0] for file in files)))
+                    continue
+                by_full = {}
+                for file in files:
+                    if file[0] in full:
+                        by_full.setdefault(full[file[0]], []).append(file[0])
+                duplicates += [(size, sorted(paths)) for paths in by_full.values() if len(paths) > 1]
+            self.save_file_hashes()
+        except Exception as e:
+            print(f"Error finding duplicates: {e}")
+            progress(f"Error finding duplicates: {e}")
+            return
+
+        # Most wasted space first
+        duplicates.sort(key=lambda group: group[0] * (len(group[1]) - 1), reverse=True)
+        done(duplicates)
+
+    def hash_files(self, files, kind, hasher, token):
+        """Hash (path, size, mtime) files on the io pool, reusing cached hashes of unchanged files.
+
+        At most DUPLICATE_HASH_WINDOW files are queued at a time, at background priority.
+        Returns {path: digest} for the files that could be read, or None if cancelled.
+        """
+        digests = {}
+        futures = {}
+        pending = iter(files)
+        while True:
+            for path, size, mtime in pending:
+                key = self.normalize_path(path)
+                cached = self.file_hashes.get(key)
+                if cached and cached['size'] == size and cached['mtime'] == mtime and kind in cached:
+                    digests[path] = cached[kind]
+                    continue
+                future = self.scheduler.submit(hasher, path, token, priority=TASK_PRIORITY_BACKGROUND, token=token,
+                                               on_error=lambda e: None)
+                futures[future] = (path, size, mtime, key)
+                if len(futures) >= DUPLICATE_HASH_WINDOW:
+                    break
+            if not futures:
+                return digests
+
+            finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+            if token.cancelled:
+                return None
+            for future in finished:
+                path, size, mtime, key = futures.pop(future)
+                try:
+                    digest = future.result()
+                except Exception:
+                    continue  # Unreadable - it can't be compared
+                if digest is None:
+                    return None
+                digests[path] = digest
+                cached = self.file_hashes.get(key)
+                if not cached or cached['size'] != size or cached['mtime'] != mtime:
+                    cached = self.file_hashes[key] = {'size': size, 'mtime': mtime}
+                cached[kind] = digest
+
+    def load_file_hashes(self):
+        self.file_hashes = {}
+        try:
+            if os.path.exists(DUPLICATE_HASH_CACHE):
+                with open(DUPLICATE_HASH_CACHE, 'r', encoding='utf-8') as file:
+                    self.file_hashes = json.load(file)
+        except Exception as e:
+            print(f"Error loading file hash cache: {e}")
+
+    def save_file_hashes(self):
+        try:
+            write_json_atomic(DUPLICATE_HASH_CACHE, self.file_hashes)
+        except Exception as e:
+            print(f"Error saving file hash cache: {e}")
+
+    def open_media_at(self, file_path, seconds):
+        """Open a media file in the viewer and start playing it from `seconds`"""
+        if not os.path.exists(file_path):
+            messagebox.showerror("Error", f"File not found:\n{file_path}")
+            return
+        # Already playing - seek right away
+        if self.current_media_file == file_path and self.vlc_player and self.media_playing:
+            self.pending_seek = None
+            self.vlc_player.set_time(int(seconds * 1000))
+            return
+
+        # The seek is applied by on_player_events when VLC reports the media has started
+        self.pending_seek = (file_path, seconds)
+        if self.current_media_file == file_path and self.vlc_player:
+            self.play_media()
+            return
+        # Selecting the file in the tree displays it; otherwise open it directly
+        if not self.reveal_path(file_path):
+            self.display_file(file_path)
+
+    def reveal_path(self, path):
+        """Expand the tree down to `path` and select it. Returns False if it isn't in the tree
+        or lies inside a locked folder.
+        """
+        target = self.normalize_path(path)
+        parent = ''
+        items = self.tree.get_children('')
+        while items:
+            for item in items:
+                values = self.tree.item(item, 'values')
+                if not values:
+                    continue
+                item_path = self.normalize_path(values[0])
+                if item_path == target:
+                    self.tree.selection_set(item)
+                    self.tree.see(item)
+                    return True
+                if target.startswith(item_path.rstrip(os.sep) + os.sep):
+                    # A locked folder's contents stay out of the tree, as when it is clicked
+                    if not self.is_item_unlocked(values[0]):
+                        return False
+                    # Load the folder's contents if it hasn't been expanded yet
+                    children = self.tree.get_children(item)
+                    if len(children) == 1 and self.tree.item(children[0], 'text') == 'Loading...':
+                        self.tree.delete(children[0])
+                        self.add_directory_contents(item, values[0])
+                    self.tree.item(item, open=True)
+                    parent = item
+                    items = self.tree.get_children(item)
+                    break
+            else:
+                if parent not in self.virtual_dirs:
+                    return False
+                # The path may be further down a large folder - only check the newly added rows
+                checked = len(self.tree.get_children(parent)) - 1
+                self.add_directory_page(parent)
+                items = self.tree.get_children(parent)[checked:]
+        return False
+
+    def generate_folder_captions(self):
+        selection = self.tree.selection()
+        if not selection:
+            return
+        folder = self.tree.item(selection[0], 'values')[0]
+        if not os.path.isdir(folder):
+            return
+        if self.caption_batch is not None:
+            messagebox.showinfo("Info", "A caption batch is already running.")
+            return
+        self.start_caption_batch(folder)
+
+    def offer_caption_batch_resume(self):
+        """Ask to continue a folder batch that was interrupted by a crash or restart"""
+        try:
+            with open(CAPTION_BATCH_MANIFEST, 'r', encoding='utf-8') as file:
+                manifest = json.load(file)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print(f"Error loading caption batch: {e}")
+            return
+
+        finished = set(manifest.get('done', [])) | set(manifest.get('failed', []))
+        remaining = [f for f in manifest.get('files', []) if f not in finished and os.path.exists(f)]
+        if remaining and messagebox.askyesno(
+            "Resume Captions",
+            f"An unfinished caption batch for:\n{manifest.get('folder')}\nhas {len(remaining)} files left. Resume it now?"
+        ):
+            self.start_caption_batch(manifest.get('folder'), manifest)
+        else:
+            try:
+                os.remove(CAPTION_BATCH_MANIFEST)
+            except OSError:
+                pass
+
+    def find_caption_batch_files(self, folder):
+        """List every audio/video file under a folder, skipping hidden and locked items"""
+        def allowed(path):
+            return (not os.path.basename(path).startswith('.')
+                    and self.is_item_visible(path) and self.is_item_unlocked(path))
+
+        files = []
+        for dir_path, dir_names, file_names in os.walk(folder):
+            dir_names[:] = sorted(d for d in dir_names if allowed(os.path.join(dir_path, d)))
+            for name in sorted(file_names):
+                path = os.path.join(dir_path, name)
+                ext = os.path.splitext(name)[1].lower()
+                if (ext in VIDEO_EXTENSIONS or ext in AUDIO_EXTENSIONS) and allowed(path):
+                    files.append(path)
+        return files
+
+    def start_caption_batch(self, folder, manifest=None):
+        ffmpeg_path = get_ffmpeg_path()
+        model_path = get_vosk_model_path()
+        if not os.path.exists(ffmpeg_path) or not os.path.exists(model_path):
+            messagebox.showerror("Error", "FFmpeg or the Vosk model is missing - captions cannot be generated.")
+            return
+
+        window = tk.Toplevel(self.root)
+        window.title("Generating Captions")
+        window.geometry("500x300")
+
+        tk.Label(window, text=folder, font=self.default_font).pack(fill=tk.X, padx=10, pady=5)
+        status_label = tk.Label(window, text="Finding media files...", font=self.default_font)
+        status_label.pack(fill=tk.X, padx=10)
+        total_bar = ttk.Progressbar(window, orient=tk.HORIZONTAL, maximum=1.0)
+        total_bar.pack(fill=tk.X, padx=10, pady=5)
+        files_frame = ttk.Frame(window)
+        files_frame.pack(fill=tk.BOTH, expand=True, padx=10)
+
+        self.caption_batch = batch = {
+            'folder': folder,
+            'cancelled': False,
+            'cancel_event': None,
+            'lock': threading.Lock(),
+            'active': {},  # path -> fraction done
+            'rows': {},  # path -> (frame, progress bar)
+            'sizes': {},  # path -> file size in bytes, used to weight progress
+            'total_bytes': 0,
+            'done_bytes': 0,
+            'done_files': 0,
+            'total_files': 0,
+            'start_time': time.time(),
+            'window': window,
+            'status_label': status_label,
+            'total_bar': total_bar,
+            'files_frame': files_frame,
+            'refresh_pending': False,
+        }
+
+        def cancel():
+            batch['cancelled'] = True
+            if batch['cancel_event'] is not None:
+                batch['cancel_event'].set()
+            status_label.config(text="Cancelling...")
+
+        ttk.Button(window, text="Cancel", command=cancel).pack(pady=5)
+        window.protocol("WM_DELETE_WINDOW", cancel)
+
+        self.scheduler.spawn(self.run_caption_batch, batch, ffmpeg_path, model_path, manifest)
+
+    def run_caption_batch(self, batch, ffmpeg_path, model_path, manifest):
+        batch['cancel_event'] = get_caption_manager().Event()
+        if batch['cancelled']:
+            batch['cancel_event'].set()
+
+        if manifest is None:
+            manifest = {'folder': batch['folder'], 'files': self.find_caption_batch_files(batch['folder']),
+                        'done': [], 'failed': []}
+        manifest.setdefault('done', [])
+        manifest.setdefault('failed', [])
+        finished = set(manifest['done']) | set(manifest['failed'])
+        files = [f for f in manifest['files'] if f not in finished and os.path.exists(f)]
+
+        sizes = {}
+        for path in files:
+            try:
+                sizes[path] = os.path.getsize(path)
+            except OSError:
+                sizes[path] = 0
+        with batch['lock']:
+            batch['sizes'] = sizes
+            batch['total_files'] = len(files)
+            batch['total_bytes'] = sum(sizes.values())
+
+        def save_manifest():
+            try:
+                os.makedirs(CAPTION_CACHE_DIR, exist_ok=True)
+                write_json_atomic(CAPTION_BATCH_MANIFEST, manifest)
+            except Exception as e:
+                print(f"Error saving caption batch: {e}")
+
+        def caption_file(path):
+            if batch['cancelled']:
+                return False
+            with batch['lock']:
+                batch['active'][path] = 0.0
+            self.schedule_caption_batch_refresh(batch)
+
+            def progress(fraction):
+                with batch['lock']:
+                    batch['active'][path] = fraction
+                self.schedule_caption_batch_refresh(batch)
+
+            try:
+                transcribe_media(ffmpeg_path, model_path, path, progress, cancel_event=batch['cancel_event'])
+            finally:
+                with batch['lock']:
+                    del batch['active'][path]
+            return True
+
+        save_manifest()
+        with ThreadPoolExecutor(max_workers=CAPTION_BATCH_FILES) as files_pool:
+            futures = {files_pool.submit(caption_file, path): path for path in files}
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    if not future.result():
+                        continue
+                    manifest['done'].append(path)
+                except CaptionCancelled:
+                    continue  # Left in the manifest so a resumed batch picks it up again
+                except Exception as e:
+                    print(f"Caption generation failed for {path}: {e}")
+                    manifest['failed'].append(path)
+                # Checkpoint after every file so an interrupted batch can resume
+                save_manifest()
+                with batch['lock']:
+                    batch['done_files'] += 1
+                    batch['done_bytes'] += sizes[path]
+                self.schedule_caption_batch_refresh(batch)
+
+        if not batch['cancelled']:
+            try:
+                os.remove(CAPTION_BATCH_MANIFEST)
+            except OSError:
+                pass
+        self.scheduler.post(self.finish_caption_batch, batch, manifest)
+
+    def schedule_caption_batch_refresh(self, batch):
+        # Coalesce progress updates from the worker threads into one UI refresh
+        with batch['lock']:
+            if batch['refresh_pending']:
+                return
+            batch['refresh_pending'] = True
+        self.scheduler.post(self.refresh_caption_batch_window, batch)
+
+    def refresh_caption_batch_window(self, batch):
+        with batch['lock']:
+            batch['refresh_pending'] = False
+            active = dict(batch['active'])
+            done_bytes = batch['done_bytes']
+            total_bytes = batch['total_bytes']
+            done_files = batch['done_files']
+            total_files = batch['total_files']
+        if not batch['window'].winfo_exists():
+            return
+
+        # Files in progress count towards the total by how far along they are
+        sizes_done = done_bytes + sum(batch['sizes'][path] * fraction for path, fraction in active.items())
+        fraction_done = sizes_done / total_bytes if total_bytes else 0.0
+        batch['total_bar']['value'] = fraction_done
+
+        status = f"{done_files} / {total_files} files"
+        elapsed = time.time() - batch['start_time']
+        if fraction_done > 0:
+            remaining = int(elapsed / fraction_done * (1 - fraction_done))
+            status += f" - about {self.format_time(remaining * 1000)} left"
+        if batch['cancelled']:
+            status = "Cancelling..."
+        batch['status_label'].config(text=status)
+
+        # One row per file that is being transcribed right now
+        for path in list(batch['rows']):
+            if path not in active:
+                batch['rows'].pop(path)[0].destroy()
+        for path, fraction in active.items():
+            if path not in batch['rows']:
+                row = ttk.Frame(batch['files_frame'])
+                row.pack(fill=tk.X, pady=2)
+                tk.Label(row, text=os.path.basename(path), font=self.default_font, anchor=tk.W).pack(fill=tk.X)
+                bar = ttk.Progressbar(row, orient=tk.HORIZONTAL, maximum=1.0)
+                bar.pack(fill=tk.X)
+                batch['rows'][path] = (row, bar)
+            batch['rows'][path][1]['value'] = fraction
+
+    def finish_caption_batch(self, batch, manifest):
+        self.caption_batch = None
+        if batch['window'].winfo_exists():
+            batch['window'].destroy()
+        if batch['cancelled']:
+            messagebox.showinfo("Captions", "Caption batch cancelled. It can be resumed the next time the program starts.")
+        else:
+            message = f"Captions generated for {len(manifest['done'])} files."
+            if manifest['failed']:
+                message += f"\n{len(manifest['failed'])} files failed."
+            messagebox.showinfo("Captions", message)
+        # Show the new captions if the open media file was part of the batch
+        if self.current_media_file and self.caption_track is None:
+            self.load_cached_captions(self.current_media_file)
+
     def setup_vlc_environment(self):  # Add self parameter
         """Setup VLC environment for PyInstaller executable"""
         import os
@@ -1765,6 +5679,10 @@ def main():
     root = tk.Tk()
     app = FileOrganizerApp(root)
     root.mainloop()
+    app.stop_playlist()
+    app.scheduler.shutdown()
+    shutdown_caption_pools()
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # Needed for the caption worker processes in the packaged executable
     main()
\ No newline at end of file